@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Uçtan uca kıyaslama: fikstürler (fixtures.py) + yerel sahte Telegram (fake_telegram.py) üzerinde
+run_scrape'i çalıştırır ve aşama başına süreleri (stages.py), bekleme sürelerini
+(readiness.py) ve Playwright çağrı sayılarını JSON raporuna yazar.
+
+    python bench/run.py                           # http + playwright, 3 tekrar
+    python bench/run.py --engine http --repeat 10
+    python bench/run.py --compare bench/results/önceki.json
+
+Rapor: bench/results/<zaman>-<commit>.json; --compare ile aşama medyanları karşılaştırılır.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# telegram.py token/chat id'yi import anında okur; gerçek bot hiç kullanılmaz
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "bench:token")
+os.environ.setdefault("TELEGRAM_CHAT_ID", "1000")
+
+import yaml  # noqa: E402
+
+import fixtures  # noqa: E402
+import fake_telegram  # noqa: E402
+import readiness  # noqa: E402
+import stages  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, "bench", "results")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def bench_overrides(cfg: dict, engine: str, telegram_url: str) -> dict:
+    """Kıyaslamada ağ/nezaket beklemelerini kapatan config değişiklikleri."""
+    tcfg = dict(cfg.get("telegram") or {})
+    tcfg.update({
+        "api_base": telegram_url,
+        "per_chat_rate": 10_000, "group_chat_rate": 10_000, "global_rate": 10_000,
+    })
+    return {
+        "engine": engine,
+        "detail_delay": [0, 0],
+        "detail_min_interval": 0,
+        "telegram": tcfg,
+    }
+
+
+def run_once(fixture: str, engine: str, telegram: fake_telegram.FakeBotAPI, cfg: dict,
+             latency_ms: float) -> dict:
+    telegram.reset()
+    started = time.perf_counter()
+    new_items = fixtures.replay(
+        fixture, overrides=bench_overrides(cfg, engine, telegram.url),
+        port=_free_port(), latency_ms=latency_ms,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    return {
+        "engine": engine,
+        "wall_ms": round(wall_ms, 1),
+        "new_items": len(new_items or []),
+        "messages": telegram.stats()["ok"],
+        "wait_ms": round(readiness.stats.total_ms(), 1),
+        "stages": stages.stats.summary(),
+    }
+
+
+def aggregate(runs: list) -> dict:
+    """Motor -> aşama -> tekrarlar arası medyan toplam süre / çağrı sayısı."""
+    out = {}
+    for engine in sorted({r["engine"] for r in runs}):
+        rs = [r for r in runs if r["engine"] == engine]
+        agg = {"wall_ms": round(statistics.median(r["wall_ms"] for r in rs), 1), "stages": {}}
+        names = sorted({n for r in rs for n in r["stages"]})
+        for name in names:
+            totals = [r["stages"].get(name, {}).get("total_ms", 0.0) for r in rs]
+            ipc = [r["stages"].get(name, {}).get("ipc", {}).get("total", 0) for r in rs]
+            agg["stages"][name] = {"median_total_ms": round(statistics.median(totals), 2)}
+            if any(ipc):
+                agg["stages"][name]["median_ipc"] = statistics.median(ipc)
+        out[engine] = agg
+    return out
+
+
+def print_report(report: dict, baseline: dict = None):
+    for engine, agg in report["aggregate"].items():
+        base = (baseline or {}).get("aggregate", {}).get(engine, {})
+        print(f"\n[{engine}] wall={agg['wall_ms']:.0f} ms" + (
+            f" (önce {base['wall_ms']:.0f} ms)" if base.get("wall_ms") else ""))
+        for name, s in agg["stages"].items():
+            line = f"  {name:22} {s['median_total_ms']:10.1f} ms"
+            if "median_ipc" in s:
+                line += f"  ipc={s['median_ipc']:.0f}"
+            old = base.get("stages", {}).get(name)
+            if old and old.get("median_total_ms"):
+                delta = (s["median_total_ms"] - old["median_total_ms"]) / old["median_total_ms"] * 100
+                line += f"  ({delta:+.0f}%)"
+            print(line)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="run_scrape uçtan uca kıyaslama")
+    ap.add_argument("--fixture", default=os.path.join(ROOT, "fixtures", "sample"))
+    ap.add_argument("--engine", choices=["http", "playwright", "all"], default="all")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--page-latency-ms", type=float, default=0, help="fikstür sunucusu gecikmesi")
+    ap.add_argument("--telegram-latency-ms", type=float, default=0, help="sahte Telegram gecikmesi")
+    ap.add_argument("--out", help="rapor yolu (varsayılan bench/results/<zaman>-<commit>.json)")
+    ap.add_argument("--compare", help="karşılaştırılacak önceki rapor")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s | %(levelname)s | %(message)s")
+    engines = ["http", "playwright"] if args.engine == "all" else [args.engine]
+    with open(os.path.join(ROOT, "config.yaml"), "r", encoding="utf-8") as f:
+        cfg = yaml.safe_load(f) or {}
+    fixture = fixtures.resolve_fixture_dir(args.fixture)
+    stages.install_ipc_counter()
+
+    runs = []
+    cwd = os.getcwd()
+    os.chdir(ROOT)  # fixtures.replay config.yaml'ı buradan kopyalar
+    try:
+        with fake_telegram.FakeBotAPI(latency_ms=args.telegram_latency_ms) as tg:
+            for engine in engines:
+                for i in range(args.repeat):
+                    r = run_once(fixture, engine, tg, cfg, args.page_latency_ms)
+                    r["repeat"] = i + 1
+                    runs.append(r)
+                    print(f"{engine} #{i + 1}: {r['wall_ms']:.0f} ms, {r['new_items']} ilan, "
+                          f"{r['messages']} mesaj")
+    finally:
+        os.chdir(cwd)
+        stages.uninstall_ipc_counter()
+
+    commit = _git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "fixture": fixtures.load_manifest(fixture).get("version"),
+            "repeat": args.repeat,
+            "page_latency_ms": args.page_latency_ms,
+            "telegram_latency_ms": args.telegram_latency_ms,
+        },
+        "aggregate": aggregate(runs),
+        "runs": runs,
+    }
+    out = args.out or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{commit}.json"
+    )
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f"\nRapor: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Fiyat/tarih farkındalıklı yeniden bildirim kuralları
+- Kayıt anahtarı URL olarak kalır; kayıtta iki fiyat tutulur:
+    * price          : ana sayfada son görülen fiyat
+    * notified_price : aboneye son bildirilen fiyat (eski kayıtlarda yoksa price)
+- Ana sayfa kartındaki fiyat son görülenle aynıysa detay sayfasına hiç gidilmez
+- Fiyat değiştiyse bildirilen fiyata göre:
+    * en az price_drop_pct % düştüyse        → "price_drop" (yeniden bildir)
+    * düştüyse ve new_dates açıksa           → detay kontrol edilir; yeni tarih aralığı varsa
+                                               bildir, yoksa sessizce güncelle
+    * bildirilen fiyatın altına inmediyse     → "price_up": detaya gitmeden son görülen fiyat
+                                               güncellenir (bildirilen fiyata dönüş de bildirilmez)
+"""
+
+import hashlib
+
+NEW = "new"
+PRICE_DROP = "price_drop"
+RECHECK = "recheck"
+PRICE_UP = "price_up"
+
+
+def _h(s: str, n: int = 16) -> str:
+    return hashlib.sha1(s.encode("utf-8")).hexdigest()[:n]
+
+
+def date_keys(dates_lines) -> list:
+    """Her tarih satırı için kısa özet (kayıtta küme olarak saklanır)."""
+    return sorted({_h(line, 8) for line in dates_lines or []})
+
+
+def notified_price(entry) -> int:
+    """Aboneye son bildirilen fiyat (alan eklenmeden önce yazılmış kayıtlarda price)."""
+    entry = entry or {}
+    return int(entry.get("notified_price") or entry.get("price") or 0)
+
+
+class RenotifyRules:
+    def __init__(self, price_drop_pct: float = 0, new_dates: bool = False):
+        self.price_drop_pct = price_drop_pct
+        self.new_dates = new_dates
+
+    @classmethod
+    def from_config(cls, cfg: dict):
+        r = cfg.get("renotify") or {}
+        return cls(float(r.get("price_drop_pct") or 0), bool(r.get("new_dates", False)))
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.price_drop_pct or self.new_dates)
+
+
+def classify(item: dict, entry, rules: RenotifyRules):
+    """
+    Kart (ana sayfa verisi) ve kayıt karşılaştırılır. Dönüş:
+      NEW / PRICE_DROP / RECHECK → detay sayfası ziyaret edilecek
+      PRICE_UP                   → detaya gidilmez, kayıttaki fiyat güncellenir (refresh_price)
+      None                       → atla (detaya gidilmez)
+    """
+    if entry is None:
+        return NEW
+    if not rules.enabled:
+        return None
+    new_price = int(item.get("price") or 0)
+    seen_price = int(entry.get("price") or 0)
+    # Fiyat okunamadıysa ya da son görülenle aynıysa kart değişmemiş sayılır
+    if not new_price or not seen_price or new_price == seen_price:
+        return None
+    base = notified_price(entry)
+    if new_price >= base:
+        return PRICE_UP
+    if rules.price_drop_pct and new_price <= base * (1 - rules.price_drop_pct / 100):
+        return PRICE_DROP
+    if rules.new_dates:
+        return RECHECK
+    return None
+
+
+def refresh_price(entry: dict, item: dict) -> dict:
+    """Son görülen fiyatı günceller; bildirilen fiyat ve tarih kümesi olduğu gibi kalır."""
+    record = dict(entry)
+    record["notified_price"] = notified_price(entry)
+    record["price"] = item.get("price", 0)
+    return record
+
+
+def added_dates(entry, dates_lines) -> list:
+    """Kayıtta olmayan (yeni eklenmiş) tarih satırlarını döner."""
+    known = set((entry or {}).get("date_keys") or [])
+    return [line for line in dates_lines or [] if _h(line, 8) not in known]
+
+
+def entry_fields(item: dict, dates_lines, notified: bool = True) -> dict:
+    """
+    Detay sayfasından sonra kayda yazılacak alanlar. notified=False (sessiz güncelleme)
+    iken bildirilen fiyat kayıttaki değerde kalır; çağıran onu ayrıca ekler.
+    """
+    fields = {
+        "url": item["url"],
+        "price": item.get("price", 0),
+        "date_keys": date_keys(dates_lines),
+    }
+    if notified:
+        fields["notified_price"] = item.get("price", 0)
+    return fields
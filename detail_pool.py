@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Eşzamanlı detay sayfası çekimi (playwright.async_api)
+- Tek BrowserContext içinde N sayfalık havuz; BrowserSession'ın tarayıcısına CDP ile
+  bağlanır ve çevrimler arasında açık kalır (ikinci bir Chromium başlatılmaz)
+- Host başına nezaket sınırlayıcı (kör time.sleep yerine)
+- Sonuçlar tamamlandıkça on_result(item, raw_items, error) ile bildirilir
+"""
+
+import time
+import random
+import asyncio
+import threading
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright
+
+import readiness
+import stages
+
+# Detay sayfasındaki tarih <li> metinlerini tek evaluate ile toplar.
+# scraper.collect_detail_dates'teki başlık odaklı arama + içerik alanı yedeğiyle aynı mantık.
+DATE_ITEMS_JS = """
+() => {
+    const txt = el => (el.innerText || '').trim();
+    const out = [];
+    // Kovalar aynı <li>'yi birden çok kez getirebilir; her öğe bir kez okunur
+    const seen = new Set();
+    const push = li => { if (seen.has(li)) return; seen.add(li); const s = txt(li); if (s) out.push(s); };
+    for (const h of document.querySelectorAll('h1, h2, h3, h4, h5, h6')) {
+        const t = txt(h).toLowerCase();
+        if (!t || !['tarih', 'tarihler', 'uygun tarih'].some(k => t.includes(k))) continue;
+        const parent = h.parentElement ? h.parentElement.closest('div, section, article') : null;
+        const following = [];
+        const snap = document.evaluate('following::ul[1]/li', h, null,
+                                       XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let i = 0; i < snap.snapshotLength; i++) following.push(snap.snapshotItem(i));
+        const buckets = [
+            parent ? parent.querySelectorAll('ul li') : [],
+            following,
+            parent ? parent.querySelectorAll('.elementor-widget-container ul li') : [],
+        ];
+        for (const b of buckets) for (const li of b) push(li);
+    }
+    if (!out.length) {
+        const roots = ['article .entry-content', 'main .entry-content', 'article',
+                       'div.elementor-widget-container', '.elementor-section .elementor-container'];
+        for (const root of roots)
+            for (const li of document.querySelectorAll(root + ' ul li')) push(li);
+    }
+    return out;
+}
+"""
+
+EXPAND_SELECTORS = [
+    'text="Devamını Oku"',
+    'text="Devamını oku"',
+    'text="Daha Fazla"',
+    'text="Daha fazla"',
+    'text="Tarih"',
+    'text="Tarihler"',
+    'role=button[name*="Tarih"i]',
+    'role=button[name*="Devam"i]',
+]
+
+
+class HostRateLimiter:
+    """
+    Aynı host'a yapılan istekleri en az min_interval (+ rasgele jitter) saniye aralıkla başlatır.
+    Farklı host'lar birbirini beklemez.
+    """
+
+    def __init__(self, min_interval: float = 0.5, jitter: float = 0.5):
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self._next_slot = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, url: str):
+        host = urlparse(url).netloc
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval + random.uniform(0, self.jitter)
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def expand_content_async(page, wait_ms: int = 600):
+    """expand_content'in async karşılığı: görünür 'Devamını oku' vb. butonlara tıklar."""
+    for sel in EXPAND_SELECTORS:
+        try:
+            loc = page.locator(sel).first
+            if await loc.is_visible():
+                await loc.click()
+                await readiness.wait_for_date_items_async(page, wait_ms, name="expand")
+        except Exception:
+            pass
+
+
+async def visit_all(pages, items, on_result, limiter: HostRateLimiter,
+                    nav_timeout: int = 25_000, wait_ms: int = 6_000, expand_wait_ms: int = 600):
+    """
+    items içindeki her ilanın detay sayfasını verilen sayfa havuzuyla ziyaret eder.
+    Her sonuç tamamlanır tamamlanmaz on_result(item, raw_items, error) ayrı bir
+    thread'de çağrılır; böylece gönderim sırasında diğer sayfalar yüklenmeye devam eder.
+    """
+    free = asyncio.Queue()
+    for page in pages:
+        free.put_nowait(page)
+
+    async def visit(item):
+        page = await free.get()
+        try:
+            await limiter.wait(item["url"])
+            # Nezaket beklemesi hariç, sayfa başına süre
+            t0 = time.perf_counter()
+            await page.goto(item["url"], timeout=nav_timeout, wait_until="domcontentloaded")
+            await readiness.wait_for_date_items_async(page, wait_ms)
+            await expand_content_async(page, expand_wait_ms)
+            raw_items = await page.evaluate(DATE_ITEMS_JS)
+            stages.stats.record("detail", (time.perf_counter() - t0) * 1000)
+            return item, raw_items, None
+        except Exception as e:
+            return item, [], e
+        finally:
+            free.put_nowait(page)
+
+    tasks = [asyncio.ensure_future(visit(it)) for it in items]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            item, raw_items, err = await fut
+            await asyncio.to_thread(on_result, item, raw_items, err)
+    finally:
+        # on_result hata verirse kalan ziyaretler arka planda sürmesin
+        for t in tasks:
+            if not t.done():
+                t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class DetailPool:
+    """
+    Eşzamanlı detay aşaması için kalıcı async Playwright bağlantısı.
+    - Yeni tarayıcı açmaz: BrowserSession'ın başlattığı Chromium'a CDP ile bağlanır
+      (ana sayfa ve detaylar tek tarayıcı sürecinde)
+    - Kendi thread'indeki event loop'ta çalışır (sync_playwright'ın loop'uyla çakışmaz)
+    - Context ve sayfa havuzu çevrimler arasında açık kalır; BrowserSession.close ile kapanır
+    """
+
+    def __init__(self, cdp_url: str, user_agent: str = None, resource_filter=None):
+        self.cdp_url = cdp_url
+        self.user_agent = user_agent
+        self.resource_filter = resource_filter
+        self.pw = None
+        self.browser = None
+        self.context = None
+        self.pages = []
+        self._loop = None
+        self._thread = None
+
+    @property
+    def started(self) -> bool:
+        return self.context is not None
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _start(self):
+        self.pw = await async_playwright().start()
+        self.browser = await self.pw.chromium.connect_over_cdp(self.cdp_url)
+        self.context = await self.browser.new_context(user_agent=self.user_agent, locale="tr-TR")
+        if self.resource_filter:
+            await self.resource_filter.install_async(self.context)
+
+    def start(self):
+        if self.started:
+            return self
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="detail-pool", daemon=True)
+        self._thread.start()
+        try:
+            self._call(self._start())
+        except Exception:
+            self.close()
+            raise
+        return self
+
+    async def _run(self, items, on_result, concurrency, min_interval, jitter, **kwargs):
+        while len(self.pages) < concurrency:
+            self.pages.append(await self.context.new_page())
+        pages = self.pages[:concurrency]
+        try:
+            await visit_all(pages, items, on_result, HostRateLimiter(min_interval, jitter), **kwargs)
+        finally:
+            # Çevrimler arasında son detay sayfasının DOM'u bellekte tutulmasın
+            for page in pages:
+                try:
+                    await page.goto("about:blank")
+                except Exception:
+                    pass
+
+    def run(self, items, on_result, concurrency: int = 4, min_interval: float = 0.5,
+            jitter: float = 0.5, nav_timeout: int = 25_000, wait_ms: int = 6_000,
+            expand_wait_ms: int = 600):
+        """Detay aşamasını senkron koddan çalıştırır; tüm sonuçlar bildirilince döner."""
+        if not items:
+            return
+        self.start()
+        concurrency = max(1, min(concurrency, len(items)))
+        self._call(self._run(items, on_result, concurrency, min_interval, jitter,
+                             nav_timeout=nav_timeout, wait_ms=wait_ms, expand_wait_ms=expand_wait_ms))
+
+    async def _close(self):
+        # CDP bağlantısında browser.close yalnızca bağlantıyı keser; Chromium BrowserSession'ındır
+        for closer in (self.context and self.context.close, self.browser and self.browser.close,
+                       self.pw and self.pw.stop):
+            if not closer:
+                continue
+            try:
+                await closer()
+            except Exception:
+                pass
+        # on_result'ı çalıştıran asyncio.to_thread işçileri
+        await asyncio.get_running_loop().shutdown_default_executor()
+
+    def close(self):
+        if self._loop is None:
+            return
+        try:
+            self._call(self._close())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = self._thread = None
+            self.pw = self.browser = self.context = None
+            self.pages = []
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Özet (digest) modu: birden çok ilan mesajını Telegram'ın 4096 karakter sınırına
+sığacak şekilde daha az mesajda birleştirir
+- Bölme her zaman ilan sınırında yapılır; tek başına sınırı aşan ilan satır sınırından bölünür
+- DigestBuffer, NotificationQueue ile aynı submit() arayüzünü sunar; dolan paket hemen,
+  kalan paket flush() ile kuyruğa verilir
+"""
+
+TELEGRAM_MAX_CHARS = 4096
+SEPARATOR = "\n\n➖➖➖➖➖\n\n"
+
+
+def split_long(text: str, max_chars: int = TELEGRAM_MAX_CHARS) -> list:
+    """Sınırı aşan tek mesajı satır sınırlarından (gerekirse sert) böler."""
+    if len(text) <= max_chars:
+        return [text]
+    parts, cur = [], ""
+    for line in text.split("\n"):
+        while len(line) > max_chars:
+            if cur:
+                parts.append(cur)
+                cur = ""
+            parts.append(line[:max_chars])
+            line = line[max_chars:]
+        candidate = f"{cur}\n{line}" if cur else line
+        if len(candidate) > max_chars:
+            parts.append(cur)
+            cur = line
+        else:
+            cur = candidate
+    if cur:
+        parts.append(cur)
+    return parts
+
+
+def digest_settings(cfg: dict, chat_id: str = None) -> dict:
+    """
+    config.yaml'daki digest bloğu; digest.chats altında sohbet id'sine özel
+    ayar varsa genel ayarların üzerine yazılır.
+    """
+    base = dict(cfg.get("digest") or {})
+    per_chat = (base.pop("chats", None) or {}).get(str(chat_id)) if chat_id else None
+    if per_chat:
+        base.update(per_chat)
+    base.setdefault("enabled", False)
+    base["max_chars"] = min(int(base.get("max_chars") or TELEGRAM_MAX_CHARS), TELEGRAM_MAX_CHARS)
+    return base
+
+
+class DigestBuffer:
+    """submit() ile gelen mesajları biriktirip paketler halinde notifier.submit_batch'e verir."""
+
+    def __init__(self, notifier, max_chars: int = TELEGRAM_MAX_CHARS, separator: str = SEPARATOR,
+                 chat_id: str = None):
+        self.notifier = notifier
+        self.chat_id = chat_id
+        self.max_chars = max_chars
+        self.separator = separator
+        self.parts = []
+        self.length = 0
+
+    @property
+    def outbox(self):
+        return self.notifier.outbox
+
+    def submit(self, text: str, on_ack=None, on_fail=None, label: str = "",
+               key: str = None, meta: dict = None, chat_id: str = None):
+        """chat_id yok sayılır; tampon tek bir sohbete aittir (self.chat_id)."""
+        add = len(text) + (len(self.separator) if self.parts else 0)
+        if self.parts and self.length + add > self.max_chars:
+            self.flush()
+            add = len(text)
+        self.parts.append((text, on_ack, on_fail, label, key, meta))
+        self.length += add
+
+    def flush(self):
+        if not self.parts:
+            return
+        parts, self.parts, self.length = self.parts, [], 0
+        if len(parts) == 1:
+            # Tek ilan: normal mesaj (gerekirse satır sınırından bölünür)
+            text, on_ack, on_fail, label, key, meta = parts[0]
+            self.notifier.submit_batch(split_long(text, self.max_chars), parts, label, self.chat_id)
+        else:
+            joined = self.separator.join(p[0] for p in parts)
+            self.notifier.submit_batch([joined], parts, f"özet ({len(parts)} ilan)", self.chat_id)
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Yerel sahte Telegram Bot API sunucusu (yük testi / çevrimdışı kıyaslama için)
+- POST /bot<token>/sendMessage: JSON ya da form gövdesi; chat_id/text doğrulanır,
+  4096 karakteri aşan metin 400 döner
+- Hata enjeksiyonu:
+    * latency_ms (+ jitter_ms)  : her yanıttan önce bekleme
+    * p429 / retry_after        : rasgele 429 + parameters.retry_after
+    * p5xx                      : rasgele 502
+    * chat_rate                 : bir sohbete saniyede chat_rate'ten fazla mesaj gelirse 429
+                                  (gerçek Telegram davranışı; istemci token bucket'ını sınar)
+- GET /stats: sayaçlar (JSON)
+
+Kullanım:
+    python fake_telegram.py serve --port 8081 --latency-ms 50 --p429 0.02 --p5xx 0.01
+    TELEGRAM_API_BASE=http://127.0.0.1:8081 python scraper.py
+    python fake_telegram.py loadtest --messages 3000 --chats 100 --global-rate 100
+"""
+
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+
+MAX_TEXT = 4096
+
+
+class FakeBotAPI:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0,
+                 jitter_ms: float = 0, p429: float = 0, retry_after: int = 1, p5xx: float = 0,
+                 chat_rate: float = 0, seed: int = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.p429 = p429
+        self.retry_after = retry_after
+        self.p5xx = p5xx
+        self.chat_rate = chat_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent = {}   # chat_id -> son 1 sn'deki kabul zamanları
+        self.reset()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset(self):
+        with self._lock:
+            self.counts = {"requests": 0, "ok": 0, "429": 0, "5xx": 0, "400": 0}
+            self.per_chat = {}
+            self.first_at = None
+            self.last_at = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self.counts)
+            out["chats"] = len(self.per_chat)
+            out["max_per_chat"] = max(self.per_chat.values(), default=0)
+            if self.first_at is not None and self.last_at > self.first_at:
+                out["ok_per_min"] = round(self.counts["ok"] / (self.last_at - self.first_at) * 60, 1)
+            return out
+
+    def _decide(self, chat_id: str, text: str):
+        """Yanıt: (status, gövde sözlüğü ya da None, ek başlıklar)."""
+        now = time.monotonic()
+        with self._lock:
+            self.counts["requests"] += 1
+            if not chat_id or not text:
+                self.counts["400"] += 1
+                return 400, {"ok": False, "error_code": 400,
+                             "description": "Bad Request: message text is empty"}, {}
+            if len(text) > MAX_TEXT:
+                self.counts["400"] += 1
+                return 400, {"ok": False, "error_code": 400,
+                             "description": "Bad Request: message is too long"}, {}
+            if self.p5xx and self._rng.random() < self.p5xx:
+                self.counts["5xx"] += 1
+                return 502, None, {}
+            limited = False
+            if self.chat_rate:
+                recent = self._recent.setdefault(chat_id, deque())
+                while recent and now - recent[0] >= 1.0:
+                    recent.popleft()
+                limited = len(recent) >= self.chat_rate
+            if limited or (self.p429 and self._rng.random() < self.p429):
+                self.counts["429"] += 1
+                ra = self.retry_after
+                return 429, {"ok": False, "error_code": 429,
+                             "description": f"Too Many Requests: retry after {ra}",
+                             "parameters": {"retry_after": ra}}, {"Retry-After": str(ra)}
+            if self.chat_rate:
+                self._recent[chat_id].append(now)
+            self.counts["ok"] += 1
+            self.per_chat[chat_id] = self.per_chat.get(chat_id, 0) + 1
+            self.first_at = self.first_at if self.first_at is not None else now
+            self.last_at = now
+            return 200, {"ok": True, "result": {"message_id": self.counts["ok"],
+                                                 "chat": {"id": chat_id}, "text": text}}, {}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # istemcinin keep-alive havuzu kullanılsın
+
+            def _reply(self, status: int, body, headers=None):
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8") if body is not None \
+                    else b"Bad Gateway"
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json" if body is not None else "text/plain")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if urlparse(self.path).path == "/stats":
+                    self._reply(200, server.stats())
+                else:
+                    self._reply(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if not urlparse(self.path).path.endswith("/sendMessage"):
+                    self._reply(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+                    return
+                if "json" in (self.headers.get("Content-Type") or ""):
+                    try:
+                        payload = json.loads(raw or b"{}")
+                    except ValueError:
+                        payload = {}
+                else:
+                    payload = {k: v[0] for k, v in parse_qs(raw.decode("utf-8")).items()}
+                delay = server.latency_ms + (server._rng.uniform(0, server.jitter_ms) if server.jitter_ms else 0)
+                if delay:
+                    time.sleep(delay / 1000.0)
+                status, body, headers = server._decide(str(payload.get("chat_id") or ""),
+                                                       payload.get("text") or "")
+                self._reply(status, body, headers)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-telegram", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_test(server: FakeBotAPI, messages: int = 1000, chats: int = 10, workers: int = 4,
+              per_chat_rate: float = None, global_rate: float = None, max_attempts: int = 5,
+              base_delay: float = 0.2) -> dict:
+    """
+    Sunucuya TelegramClient + NotificationQueue ile messages mesaj gönderir;
+    istemci tarafı sonuç ve süreyi sunucu sayaçlarıyla birlikte döner.
+    """
+    import telegram
+    from notify_queue import NotificationQueue
+
+    client = telegram.TelegramClient(
+        token="load:test", chat_id="1", api_base=server.url, pool_size=workers,
+        per_chat_rate=per_chat_rate or telegram.PER_CHAT_RATE,
+        global_rate=global_rate or telegram.GLOBAL_RATE,
+        retry=telegram.RetryPolicy(max_attempts=max_attempts, base_delay=base_delay),
+    )
+    server.reset()
+    started = time.monotonic()
+    with NotificationQueue(client.send_message, maxsize=workers * 4, workers=workers) as q:
+        for i in range(messages):
+            q.submit(f"yük testi mesajı #{i}", label=str(i), chat_id=str(1000 + i % chats))
+    elapsed = time.monotonic() - started
+    client.close()
+    srv = server.stats()
+    return {
+        "messages": messages,
+        "chats": chats,
+        "workers": workers,
+        "elapsed_s": round(elapsed, 2),
+        "sent": q.sent,
+        "failed": q.failed,
+        "sent_per_min": round(q.sent / elapsed * 60, 1) if elapsed else 0.0,
+        "retries": srv["requests"] - messages,
+        "server": srv,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Yerel sahte Telegram Bot API")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    for name in ("serve", "loadtest"):
+        p = sub.add_parser(name)
+        p.add_argument("--port", type=int, default=8081 if name == "serve" else 0)
+        p.add_argument("--latency-ms", type=float, default=0)
+        p.add_argument("--jitter-ms", type=float, default=0)
+        p.add_argument("--p429", type=float, default=0, help="rasgele 429 olasılığı")
+        p.add_argument("--retry-after", type=int, default=1)
+        p.add_argument("--p5xx", type=float, default=0, help="rasgele 502 olasılığı")
+        p.add_argument("--chat-rate", type=float, default=0, help="sohbet başına sn'de izin verilen mesaj")
+        p.add_argument("--seed", type=int)
+    lt = sub.choices["loadtest"]
+    lt.add_argument("--messages", type=int, default=1000)
+    lt.add_argument("--chats", type=int, default=10)
+    lt.add_argument("--workers", type=int, default=4)
+    lt.add_argument("--per-chat-rate", type=float, help="istemci: sohbet başına mesaj/sn")
+    lt.add_argument("--global-rate", type=float, help="istemci: toplam mesaj/sn")
+    lt.add_argument("--max-attempts", type=int, default=5)
+    lt.add_argument("--base-delay", type=float, default=0.2)
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s | %(levelname)s | %(message)s")
+    server = FakeBotAPI(port=args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                        p429=args.p429, retry_after=args.retry_after, p5xx=args.p5xx,
+                        chat_rate=args.chat_rate, seed=args.seed)
+    with server:
+        if args.cmd == "serve":
+            print(f"TELEGRAM_API_BASE={server.url}")
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                pass
+            return
+        result = load_test(server, args.messages, args.chats, args.workers, args.per_chat_rate,
+                           args.global_rate, args.max_attempts, args.base_delay)
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
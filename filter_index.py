@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Çok aboneli filtreler için önceden derlenmiş eşleştirme dizini
+- Kalkış ve varış alt dizgileri için birer Aho-Corasick otomatı: şehir adı tek geçişte
+  tüm abonelerin kalıplarıyla karşılaştırılır
+- Fiyat üst sınırı abone -> max_price sözlüğünde; yalnızca rota eşleşen adaylar denetlenir
+- Dizin abone sırasıyla (konum) tutulur; aynı adlı iki abonenin filtreleri birbirine karışmaz
+- Sonuç apply_filters ile birebir aynıdır (boş kalkış/varış = filtre yok, 0 fiyat = sınırsız)
+"""
+
+
+class AhoCorasick:
+    """Kalıp -> değer kümeleri; find(text) metinde geçen tüm kalıpların değerlerini döner."""
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [set()]
+
+    def add(self, pattern: str, value):
+        node = 0
+        for ch in pattern:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(set())
+            node = nxt
+        self.out[node].add(value)
+
+    def build(self):
+        # Kökün çocuklarının fail bağı köke gider; diğerleri genişlik öncelikli hesaplanır
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0) if node else 0
+                self.out[nxt] |= self.out[self.fail[nxt]]
+        return self
+
+    def find(self, text: str) -> set:
+        found = set()
+        node = 0
+        for ch in text:
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            if self.out[node]:
+                found |= self.out[node]
+        return found
+
+
+class FilterIndex:
+    """
+    subs: .name ve .filters (departure, arrivals, max_price) alanları olan aboneler
+    normalize: şehir adlarını karşılaştırma biçimine getiren fonksiyon (textnorm.normalize_tr)
+    """
+
+    def __init__(self, subs, normalize):
+        self.normalize = normalize
+        self.names = []
+        self.order = {}         # ad -> ilk görüldüğü konum (sonuç sırası)
+        self.any_departure = set()
+        self.any_arrival = set()
+        self.departures = AhoCorasick()
+        self.arrivals = AhoCorasick()
+        self.unlimited_price = set()
+        self.max_price = {}     # abone konumu -> azami fiyat
+        for i, sub in enumerate(subs):
+            filt = sub.filters or {}
+            self.names.append(sub.name)
+            self.order.setdefault(sub.name, i)
+
+            dep = normalize(filt.get("departure") or "")
+            if dep:
+                self.departures.add(dep, i)
+            else:
+                self.any_departure.add(i)
+
+            arrivals = [normalize(a) for a in (filt.get("arrivals") or [])]
+            # Boş bir varış kalıbı her şeyle eşleşir (apply_filters'taki "" in s davranışı)
+            if not arrivals or any(not a for a in arrivals):
+                self.any_arrival.add(i)
+            else:
+                for a in arrivals:
+                    self.arrivals.add(a, i)
+
+            max_price = int(filt.get("max_price") or 0)
+            if max_price:
+                self.max_price[i] = max_price
+            else:
+                self.unlimited_price.add(i)
+
+        self.departures.build()
+        self.arrivals.build()
+
+    def _price_ok(self, candidates: set, price: int) -> set:
+        # Yalnızca rota eşleşmiş adaylar denetlenir (abone sayısından bağımsız)
+        return {i for i in candidates if i in self.unlimited_price or price <= self.max_price[i]}
+
+    def match(self, item: dict) -> list:
+        """İlanın geçtiği abonelerin adlarını abone sırasıyla döner."""
+        ok = self.any_departure | self.departures.find(self.normalize(item.get("origin", "")))
+        if ok:
+            ok &= self.any_arrival | self.arrivals.find(self.normalize(item.get("destination", "")))
+        if ok:
+            ok = self._price_ok(ok, int(item.get("price") or 0))
+        return sorted({self.names[i] for i in ok}, key=self.order.__getitem__)
@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+"""
+Çevrimdışı HTML fikstürleri: kayıt (record) ve yeniden oynatma (replay)
+- record : ana sayfa + ilk N ilanın detay sayfası fixtures/<sürüm>/pages altına ham HTML
+           olarak kaydedilir (--rendered ile Playwright'ın JS sonrası DOM'u);
+           fixtures/<sürüm>/manifest.json yol -> dosya eşlemesini tutar
+- serve  : ReplayServer fikstürleri yerel bir HTTP sunucusundan verir; HTML içindeki
+           kayıt anındaki site adresi sunucunun adresiyle değiştirilir
+- replay : sunucuyu açar, scraper.BASE_URL'i ona çevirir ve run_scrape'i geçici bir
+           çalışma dizininde (kendi data/ ve config.yaml kopyasıyla) çalıştırır;
+           gerçek state/outbox dosyalarına dokunulmaz; Telegram mesajları yerel sahte
+           Bot API'ye (fake_telegram.py) gider
+
+Kullanım:
+    python fixtures.py record --limit 20 [--version 2025-11-24] [--rendered]
+    python fixtures.py serve  [fixtures/<sürüm>] [--port 8765]
+    python fixtures.py replay [fixtures/<sürüm>] [--engine http|playwright]
+"""
+
+import os
+import re
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import contextlib
+import threading
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+FIXTURES_DIR = "fixtures"
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+DEFAULT_PORT = 8765
+
+
+def _path_key(url_or_path: str) -> str:
+    """URL ya da yol -> manifest anahtarı ('/ucak-bileti/x/' biçiminde, sorgu olmadan)."""
+    path = urlparse(url_or_path).path or "/"
+    return path if path.endswith("/") else path + "/"
+
+
+def _page_file(key: str) -> str:
+    if key == "/":
+        return "index.html"
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", key.strip("/")) + ".html"
+
+
+def resolve_fixture_dir(path: str = None) -> str:
+    """Verilen dizin; manifest yoksa altındaki en yeni sürüm dizini (ada göre sıralı)."""
+    # Mutlak yol: replay çalışma dizinini değiştirdikten sonra da sayfalar bulunabilsin
+    path = os.path.abspath(path or FIXTURES_DIR)
+    if os.path.exists(os.path.join(path, MANIFEST)):
+        return path
+    versions = sorted(
+        d for d in os.listdir(path) if os.path.exists(os.path.join(path, d, MANIFEST))
+    ) if os.path.isdir(path) else []
+    if not versions:
+        raise FileNotFoundError(f"Fikstür bulunamadı: {path}")
+    return os.path.join(path, versions[-1])
+
+
+def load_manifest(fixture_dir: str) -> dict:
+    with open(os.path.join(fixture_dir, MANIFEST), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FixtureWriter:
+    """Sayfaları fixtures/<sürüm>/pages altına yazar; close() manifest'i kaydeder."""
+
+    def __init__(self, base_url: str, version: str = None, root: str = FIXTURES_DIR):
+        self.version = version or datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+        self.dir = os.path.join(root, self.version)
+        os.makedirs(os.path.join(self.dir, "pages"), exist_ok=True)
+        self.manifest = {
+            "format": FORMAT_VERSION,
+            "version": self.version,
+            "base_url": base_url,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "pages": {},
+        }
+
+    def add(self, url: str, html: str):
+        key = _path_key(url)
+        name = os.path.join("pages", _page_file(key))
+        with open(os.path.join(self.dir, name), "w", encoding="utf-8") as f:
+            f.write(html)
+        self.manifest["pages"][key] = name
+
+    def close(self):
+        with open(os.path.join(self.dir, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2, ensure_ascii=False)
+        logging.info(f"Fikstür kaydedildi: {self.dir} ({len(self.manifest['pages'])} sayfa)")
+        return self.dir
+
+
+def record(limit: int = 20, version: str = None, rendered: bool = False, root: str = FIXTURES_DIR) -> str:
+    """Canlı siteden ana sayfa + ilk limit ilanın detay sayfasını kaydeder; fikstür dizinini döner."""
+    import scraper
+    import http_engine
+
+    writer = FixtureWriter(scraper.BASE_URL, version, root)
+    if not rendered:
+        session = http_engine.make_session(1)
+        try:
+            html = http_engine.fetch_html(session, scraper.BASE_URL)
+            writer.add(scraper.BASE_URL, html)
+            cards = scraper.parse_card_links(http_engine.extract_link_records(html))
+            for card in cards[:limit]:
+                try:
+                    writer.add(card["url"], http_engine.fetch_html(session, card["url"]))
+                except Exception as e:
+                    logging.warning(f"Detay kaydedilemedi: {card['url']} | {e}")
+        finally:
+            session.close()
+        return writer.close()
+
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page(user_agent=http_engine.USER_AGENT)
+        try:
+            page.goto(scraper.BASE_URL, timeout=scraper.NAV_TIMEOUT, wait_until="domcontentloaded")
+            cards = scraper.collect_cards(page)
+            writer.add(scraper.BASE_URL, page.content())
+            for card in cards[:limit]:
+                try:
+                    page.goto(card["url"], timeout=scraper.NAV_TIMEOUT, wait_until="domcontentloaded")
+                    scraper.expand_content(page)
+                    writer.add(card["url"], page.content())
+                except Exception as e:
+                    logging.warning(f"Detay kaydedilemedi: {card['url']} | {e}")
+        finally:
+            browser.close()
+    return writer.close()
+
+
+class ReplayServer:
+    """
+    Fikstür sayfalarını yerelden sunan HTTP sunucusu (ayrı thread).
+    latency_ms: her yanıttan önce bekleme (ağ gecikmesi benzetimi)
+    """
+
+    def __init__(self, fixture_dir: str = None, host: str = "127.0.0.1", port: int = 0,
+                 latency_ms: float = 0):
+        self.dir = resolve_fixture_dir(fixture_dir)
+        self.manifest = load_manifest(self.dir)
+        self.latency_ms = latency_ms
+        self.hits = 0
+        self.misses = 0
+        self._pages = {}
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def _body(self, key: str):
+        """Sayfa baytları; kayıttaki site adresi sunucu adresiyle değiştirilmiş olarak."""
+        if key not in self._pages:
+            name = self.manifest["pages"].get(key)
+            if not name:
+                return None
+            with open(os.path.join(self.dir, name), "r", encoding="utf-8") as f:
+                html = f.read()
+            base = self.manifest.get("base_url") or ""
+            if base:
+                html = html.replace(base.rstrip("/"), self.url.rstrip("/"))
+            self._pages[key] = html.encode("utf-8")
+        return self._pages[key]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if server.latency_ms:
+                    time.sleep(server.latency_ms / 1000.0)
+                body = server._body(_path_key(self.path))
+                if body is None:
+                    server.misses += 1
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                server.hits += 1
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="replay-server", daemon=True)
+        self._thread.start()
+        logging.info(f"Fikstür sunucusu: {self.url} ({self.dir}, {len(self.manifest['pages'])} sayfa)")
+        return self
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def prepare_workdir(server_url: str, workdir: str = None, config_path: str = "config.yaml",
+                    overrides: dict = None) -> str:
+    """
+    Yeniden oynatma için çalışma dizini: config.yaml kopyası (+ overrides) ve boş data/.
+    resource_filter.allow_domains doluysa yerel sunucu da izinli listeye eklenir.
+    """
+    import yaml
+
+    workdir = workdir or tempfile.mkdtemp(prefix="ucuz-replay-")
+    with open(config_path, "r", encoding="utf-8") as f:
+        cfg = yaml.safe_load(f) or {}
+    cfg.update(overrides or {})
+    rf = cfg.get("resource_filter") or {}
+    if rf.get("allow_domains"):
+        rf["allow_domains"] = list(rf["allow_domains"]) + [urlparse(server_url).hostname]
+    os.makedirs(os.path.join(workdir, "data"), exist_ok=True)
+    with open(os.path.join(workdir, "config.yaml"), "w", encoding="utf-8") as f:
+        yaml.safe_dump(cfg, f, allow_unicode=True, sort_keys=False)
+    return workdir
+
+
+def _telegram_overrides(config_path: str, overrides: dict, api_base: str) -> dict:
+    """overrides'a telegram.api_base ekler (config'teki telegram bloğunun diğer ayarları korunur)."""
+    import yaml
+
+    overrides = dict(overrides or {})
+    tcfg = overrides.get("telegram")
+    if tcfg is None:
+        with open(config_path, "r", encoding="utf-8") as f:
+            tcfg = (yaml.safe_load(f) or {}).get("telegram")
+    overrides["telegram"] = dict(tcfg or {}, api_base=api_base)
+    return overrides
+
+
+def replay(fixture_dir: str = None, workdir: str = None, overrides: dict = None,
+           port: int = DEFAULT_PORT, latency_ms: float = 0, keep: bool = False):
+    """
+    Fikstürler üzerinde tek run_scrape çevrimi; yeni ilan listesini döner.
+    overrides telegram.api_base vermiyorsa mesajlar yerel sahte Bot API'ye
+    (fake_telegram.py) gider; gerçek sohbete hiçbir şey gönderilmez. TELEGRAM_BOT_TOKEN /
+    TELEGRAM_CHAT_ID tanımlı değilse replay boyunca sahte değerler kullanılır.
+    """
+    import scraper
+    import telegram
+    import fake_telegram
+
+    config_path = os.path.abspath(scraper.CONFIG_PATH)
+    with contextlib.ExitStack() as stack:
+        server = stack.enter_context(ReplayServer(fixture_dir, port=port, latency_ms=latency_ms))
+        fake_tg = None
+        if not ((overrides or {}).get("telegram") or {}).get("api_base"):
+            fake_tg = stack.enter_context(fake_telegram.FakeBotAPI())
+            overrides = _telegram_overrides(config_path, overrides, fake_tg.url)
+            # Kimlik bilgisi yoksa mesajlar sahte API'ye gitmek yerine outbox'a düşerdi
+            old_token, old_chat = telegram.BOT_TOKEN, telegram.CHAT_ID
+            telegram.BOT_TOKEN = old_token or "replay:token"
+            telegram.CHAT_ID = old_chat or "1000"
+            stack.callback(setattr, telegram, "BOT_TOKEN", old_token)
+            stack.callback(setattr, telegram, "CHAT_ID", old_chat)
+        wd = prepare_workdir(server.url, workdir, config_path, overrides)
+        old_cwd, old_base = os.getcwd(), scraper.BASE_URL
+        os.chdir(wd)
+        scraper.BASE_URL = server.url
+        try:
+            new_items = scraper.run_scrape()
+        finally:
+            scraper.BASE_URL = old_base
+            os.chdir(old_cwd)
+            if not keep and not workdir:
+                shutil.rmtree(wd, ignore_errors=True)
+        logging.info(f"Replay tamam: {server.hits} sayfa sunuldu, {server.misses} bulunamadı"
+                     + (f", sahte Telegram'a {fake_tg.stats()['ok']} mesaj" if fake_tg else ""))
+    return new_items
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="HTML fikstürü kaydet / sun / yeniden oynat")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    rec = sub.add_parser("record", help="canlı siteden fikstür kaydet")
+    rec.add_argument("--limit", type=int, default=20, help="kaydedilecek detay sayfası sayısı")
+    rec.add_argument("--version", help="sürüm dizini adı (varsayılan: UTC zaman damgası)")
+    rec.add_argument("--rendered", action="store_true", help="Playwright ile JS sonrası DOM'u kaydet")
+    rec.add_argument("--root", default=FIXTURES_DIR)
+
+    srv = sub.add_parser("serve", help="fikstürleri yerel HTTP sunucusundan sun")
+    srv.add_argument("fixture", nargs="?")
+    srv.add_argument("--port", type=int, default=DEFAULT_PORT)
+    srv.add_argument("--latency-ms", type=float, default=0)
+
+    rep = sub.add_parser("replay", help="run_scrape'i fikstürler üzerinde çalıştır")
+    rep.add_argument("fixture", nargs="?")
+    rep.add_argument("--engine", choices=["http", "playwright"])
+    rep.add_argument("--port", type=int, default=DEFAULT_PORT)
+    rep.add_argument("--latency-ms", type=float, default=0)
+    rep.add_argument("--workdir", help="çalışma dizini (varsayılan: geçici, iş bitince silinir)")
+    rep.add_argument("--keep", action="store_true", help="geçici çalışma dizinini silme")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    if args.cmd == "record":
+        print(record(args.limit, args.version, args.rendered, args.root))
+    elif args.cmd == "serve":
+        with ReplayServer(args.fixture, port=args.port, latency_ms=args.latency_ms) as server:
+            print(f"UCUZAUCAK_BASE_URL={server.url}")
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                pass
+    else:
+        overrides = {"engine": args.engine} if args.engine else None
+        items = replay(args.fixture, args.workdir, overrides, args.port, args.latency_ms, args.keep)
+        print(f"{len(items or [])} yeni ilan")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Tarayıcısız (saf HTTP) çekim motoru
+- Ana sayfa ve detay sayfalarını havuzlu requests.Session ile indirir
+- HTML'i lxml ile ayrıştırır; Playwright tarafındaki collect_cards /
+  collect_detail_dates ile aynı ham verileri üretir:
+    * extract_link_records -> [{"href", "nav", "text"}]  (COLLECT_LINKS_JS ile aynı)
+    * extract_date_items   -> ["24 Kasım – 01 Aralık", ...]  (ham <li> metinleri)
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import html as lxml_html
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/123.0 Safari/537.36"
+)
+
+HTTP_TIMEOUT = 20
+
+# Menü/başlık/altbilgi kapsayıcıları (COLLECT_LINKS_JS'deki closest(...) ile aynı)
+_NAV_CLASSES = ["site-footer", "elementor-nav-menu", "menu", "widget"]
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+NAV_ANCESTOR_XPATH = (
+    "ancestor-or-self::*[self::header or self::nav or self::footer or self::aside or "
+    + " or ".join(_has_class(c) for c in _NAV_CLASSES)
+    + "]"
+)
+
+
+def make_session(pool_size: int = 8) -> requests.Session:
+    """Keep-alive bağlantı havuzlu ve küçük yeniden denemeli bir Session döner."""
+    s = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept-Language": "tr-TR,tr;q=0.9,en;q=0.5",
+    })
+    return s
+
+
+def fetch_html(session: requests.Session, url: str, timeout: int = HTTP_TIMEOUT) -> str:
+    resp = session.get(url, timeout=timeout)
+    resp.raise_for_status()
+    # WordPress bazen charset bildirmez; Türkçe karakterler bozulmasın
+    if not resp.encoding or resp.encoding.lower() == "iso-8859-1":
+        resp.encoding = resp.apparent_encoding or "utf-8"
+    return resp.text
+
+
+def _text(el) -> str:
+    return el.text_content() or ""
+
+
+def extract_link_records(html: str) -> list:
+    """/ucak-bileti/ linklerini href, menü içinde mi ve metin olarak döner."""
+    if not html:
+        return []
+    doc = lxml_html.fromstring(html)
+    out = []
+    for a in doc.xpath('//a[contains(@href, "/ucak-bileti/")]'):
+        out.append({
+            "href": a.get("href") or "",
+            "nav": bool(a.xpath(NAV_ANCESTOR_XPATH)),
+            "text": _text(a),
+        })
+    return out
+
+
+def extract_date_items(html: str) -> list:
+    """
+    Detay sayfasında 'Tarih' başlıklarının altındaki <li> metinlerini toplar.
+    Bulamazsa içerik alanındaki tüm ul>li metinlerine düşer.
+    """
+    if not html:
+        return []
+    doc = lxml_html.fromstring(html)
+    raw_items = []
+    seen = set()  # kovalar aynı <li>'yi birden çok kez getirebilir
+
+    def add(li):
+        if li in seen:
+            return
+        seen.add(li)
+        t = _text(li)
+        if t.strip():
+            raw_items.append(t)
+
+    for h in doc.xpath("//h1|//h2|//h3|//h4|//h5|//h6"):
+        txt = " ".join(_text(h).split())
+        if not txt:
+            continue
+        if not any(k in txt.lower() for k in ["tarih", "tarihler", "uygun tarih"]):
+            continue
+        parents = h.xpath("ancestor::*[self::div or self::section or self::article][1]")
+        buckets = [h.xpath("following::ul[1]/li")]
+        if parents:
+            parent = parents[0]
+            buckets.insert(0, parent.xpath(".//ul//li"))
+            buckets.append(parent.xpath(
+                ".//*[" + _has_class("elementor-widget-container") + "]//ul//li"
+            ))
+        for bucket in buckets:
+            for li in bucket:
+                add(li)
+
+    if not raw_items:
+        roots = [
+            "//article//*[" + _has_class("entry-content") + "]",
+            "//main//*[" + _has_class("entry-content") + "]",
+            "//article",
+            "//div[" + _has_class("elementor-widget-container") + "]",
+            "//*[" + _has_class("elementor-section") + "]//*[" + _has_class("elementor-container") + "]",
+        ]
+        for root in roots:
+            for li in doc.xpath(root + "//ul//li"):
+                add(li)
+
+    return raw_items
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+Çalıştırma başına yapılandırılmış metrikler
+- MetricsRegistry: sayaç (counter), anlık değer (gauge) ve histogram; etiket desteği
+- Süreç ömrü boyunca tek registry: tek seferlik çalıştırmada bir çevrim, daemon
+  modunda çevrimler boyunca birikir (sayaçlar/histogramlar), gauge'lar son çevrimi gösterir
+- Çıktılar (config.yaml metrics bloğu):
+    * json_path     : son çevrim + birikmiş değerler (JSON)
+    * textfile_path : Prometheus textfile biçimi (node_exporter textfile collector)
+    * http_port     : daemon modunda /metrics (Prometheus) ve /metrics.json
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+PREFIX = "ucuzaucak_"
+DETAIL_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60)
+TELEGRAM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+
+
+def _fmt(v) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{str(v)}"' for k, v in labels)
+    return "{" + inner + "}"
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, v: float):
+        self.sum += v
+        self.count += 1
+        for i, b in enumerate(self.buckets):
+            if v <= b:
+                self.counts[i] += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "buckets": {_fmt(b): c for b, c in zip(self.buckets, self.counts)},
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.meta = {}      # ad -> (tip, açıklama)
+        self.values = {}    # ad -> {etiketler: değer | Histogram}
+
+    def _slot(self, kind: str, name: str, help_: str):
+        if name not in self.meta:
+            self.meta[name] = (kind, help_)
+            self.values[name] = {}
+        return self.values[name]
+
+    def inc(self, name: str, value: float = 1, help: str = "", **labels):
+        with self._lock:
+            slot = self._slot("counter", name, help)
+            key = tuple(sorted(labels.items()))
+            slot[key] = slot.get(key, 0) + value
+
+    def set(self, name: str, value, help: str = "", **labels):
+        with self._lock:
+            self._slot("gauge", name, help)[tuple(sorted(labels.items()))] = value
+
+    def observe(self, name: str, value: float, buckets, help: str = "", **labels):
+        with self._lock:
+            slot = self._slot("histogram", name, help)
+            key = tuple(sorted(labels.items()))
+            if key not in slot:
+                slot[key] = Histogram(buckets)
+            slot[key].observe(value)
+
+    def clear_gauge(self, name: str):
+        """Etiketli gauge'un önceki çevrimden kalan serilerini siler."""
+        with self._lock:
+            if name in self.values:
+                self.values[name] = {}
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, (kind, help_) in self.meta.items():
+                full = PREFIX + name
+                if help_:
+                    lines.append(f"# HELP {full} {help_}")
+                lines.append(f"# TYPE {full} {kind}")
+                for key, v in self.values[name].items():
+                    if kind != "histogram":
+                        lines.append(f"{full}{_labels(key)} {_fmt(v)}")
+                        continue
+                    for b, c in zip(v.buckets, v.counts):
+                        lines.append(f"{full}_bucket{_labels(key + (('le', _fmt(b)),))} {c}")
+                    lines.append(f"{full}_bucket{_labels(key + (('le', '+Inf'),))} {v.count}")
+                    lines.append(f"{full}_sum{_labels(key)} {_fmt(v.sum)}")
+                    lines.append(f"{full}_count{_labels(key)} {v.count}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> dict:
+        out = {}
+        with self._lock:
+            for name, (kind, _) in self.meta.items():
+                series = {}
+                for key, v in self.values[name].items():
+                    label = ",".join(f"{k}={val}" for k, val in key) or "_"
+                    series[label] = v.to_dict() if kind == "histogram" else v
+                out[name] = series.get("_") if list(series) == ["_"] else series
+        return out
+
+
+registry = MetricsRegistry()
+
+
+def count(name: str, value: float, help: str = ""):
+    """Çevrim değeri: son çevrim gauge'u + birikmiş _total sayacı (ör. cards_found)."""
+    registry.set(name, value, help)
+    registry.inc(f"{name}_total", value, help)
+
+
+def record_run(stage_stats, wait_stats, store=None, notifier=None, box=None,
+               duration_s: float = None, peak_rss_mb: float = None, tree_rss_mb: float = None):
+    """Çevrim sonunda aşama/bekleme sayaçlarını, state ve bellek ölçümlerini registry'ye aktarır."""
+    registry.inc("runs_total", 1, "Tamamlanan tarama çevrimi")
+    registry.set("last_run_timestamp_seconds", round(time.time(), 3), "Son çevrimin bitiş zamanı (unix)")
+    if duration_s is not None:
+        registry.set("last_run_duration_seconds", round(duration_s, 3), "Son çevrimin süresi")
+
+    durations = {k: list(v) for k, v in stage_stats.durations.items()}
+    for ms in durations.get("detail", []):
+        registry.observe("detail_fetch_seconds", ms / 1000, DETAIL_BUCKETS, "Detay sayfası çekim süresi")
+    for ms in durations.get("send_message", []):
+        registry.observe("telegram_send_seconds", ms / 1000, TELEGRAM_BUCKETS,
+                         "sendMessage süresi (yeniden denemeler dahil)")
+    registry.clear_gauge("stage_seconds")
+    for stage, values in durations.items():
+        registry.set("stage_seconds", round(sum(values) / 1000, 4), "Son çevrimde aşama toplam süresi",
+                     stage=stage)
+
+    registry.clear_gauge("wait_seconds")
+    waits = {k: list(v) for k, v in wait_stats.waits.items()}
+    for wait, values in waits.items():
+        registry.set("wait_seconds", round(sum(values) / 1000, 4), "Son çevrimde hazır olma beklemeleri",
+                     wait=wait)
+    registry.inc("wait_seconds_total", round(wait_stats.total_ms() / 1000, 4), "Toplam bekleme süresi")
+
+    if notifier is not None:
+        registry.inc("telegram_sent_total", notifier.sent, "Gönderilen Telegram mesajı")
+        registry.inc("telegram_failures_total", notifier.failed, "Başarısız Telegram gönderimi")
+    if box is not None:
+        registry.set("outbox_pending", len(box), "Outbox'ta bekleyen mesaj")
+    if store is not None:
+        registry.set("state_entries", len(store.seen), "State'teki ilan kaydı")
+        registry.set("state_bytes", store.disk_bytes(), "State dosyalarının diskteki boyutu")
+    if peak_rss_mb is not None:
+        registry.set("peak_rss_megabytes", round(peak_rss_mb, 1), "Python sürecinin tepe RSS'i")
+    if tree_rss_mb is not None:
+        registry.set("tree_rss_megabytes", round(tree_rss_mb, 1), "Süreç ağacının (tarayıcı dahil) RSS'i")
+
+
+def _atomic_write(path: str, text: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def write(cfg: dict):
+    """config.yaml'daki metrics bloğuna göre JSON ve/veya Prometheus textfile yazar."""
+    mcfg = cfg.get("metrics") or {}
+    if not mcfg.get("enabled", True):
+        return
+    try:
+        if mcfg.get("json_path"):
+            _atomic_write(mcfg["json_path"], json.dumps(registry.to_dict(), indent=2, ensure_ascii=False))
+        if mcfg.get("textfile_path"):
+            _atomic_write(mcfg["textfile_path"], registry.to_prometheus())
+    except OSError as e:
+        logging.warning(f"Metrikler yazılamadı: {e}")
+
+
+class MetricsServer:
+    """Daemon modunda /metrics (Prometheus) ve /metrics.json sunan HTTP sunucusu."""
+
+    def __init__(self, port: int, host: str = "127.0.0.1", reg: MetricsRegistry = None):
+        reg = reg or registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlparse(self.path).path
+                if path == "/metrics":
+                    body, ctype = reg.to_prometheus(), "text/plain; version=0.0.4; charset=utf-8"
+                elif path == "/metrics.json":
+                    body, ctype = json.dumps(reg.to_dict(), ensure_ascii=False), "application/json"
+                else:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="metrics", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        host, port = self._httpd.server_address[:2]
+        logging.info(f"Metrikler: http://{host}:{port}/metrics")
+        return self
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Kazıma ile Telegram gönderimini ayıran üretici/tüketici kuyruğu
+- Kazıma tarafı biçimlenmiş mesajı submit() ile sınırlı kuyruğa koyar (dolunca bekler)
+- Gönderici thread(ler) kuyruğu boşaltır; hız sınırı gönderici fonksiyonundadır
+  (TelegramClient token bucket'ları)
+- Gönderim onaylanınca on_ack, başarısızsa on_fail(err) çağrılır; state ack'te yazılır
+- outbox verilmişse key'li mesajlar (yeniden denemeler tükendikten sonra) başarısız olunca
+  outbox'a yazılır, başarılı olunca outbox'tan silinir
+- submit_batch: birden çok ilanı tek (ya da sıralı birkaç) Telegram mesajı olarak gönderir
+  (digest.py); başarıda her ilanın on_ack'i çağrılır, hatada her ilan ayrı ayrı outbox'a yazılır
+- Parçalara bölünmüş tek ilan yarıda kalırsa outbox kaydının meta["chunks"] alanına yalnızca
+  gönderilmemiş parçalar yazılır (yeniden denemede gönderilenler tekrarlanmaz)
+"""
+
+import queue
+import logging
+import threading
+
+import stages
+
+_STOP = object()
+
+
+class NotificationQueue:
+    def __init__(self, send, maxsize: int = 100, workers: int = 1, outbox=None):
+        """send(text, chat_id=None) -> (ok: bool, error: str|None)"""
+        self.send = send
+        self.outbox = outbox
+        self.q = queue.Queue(maxsize=maxsize)
+        self.workers = max(1, workers)
+        self.sent = 0
+        self.failed = 0
+        self._threads = []
+        self._count_lock = threading.Lock()
+
+    def start(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"notifier-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def submit(self, text: str, on_ack=None, on_fail=None, label: str = "",
+               key: str = None, meta: dict = None, chat_id: str = None):
+        """
+        Mesajı kuyruğa ekler; kuyruk doluysa yer açılana kadar bekler (geri basınç).
+        key/meta: başarısızlıkta outbox'a yazılacak anahtar ve ek veri.
+        chat_id: hedef sohbet (None = gönderici fonksiyonun varsayılanı).
+        """
+        self.submit_batch([text], [(text, on_ack, on_fail, label, key, meta)], label, chat_id)
+
+    def submit_batch(self, texts: list, parts: list, label: str = "", chat_id: str = None):
+        """
+        texts: sırayla gönderilecek Telegram mesajları (hepsi giderse başarılı sayılır)
+        parts: texts'in kapsadığı ilanlar; (text, on_ack, on_fail, label, key, meta) demetleri
+        """
+        self.q.put((texts, parts, label, chat_id))
+
+    def _send_all(self, texts, chat_id):
+        """Dönüş: (ok, error, gönderilen mesaj sayısı)."""
+        for i, text in enumerate(texts):
+            try:
+                with stages.stage("send_message"):
+                    ok, err = self.send(text, chat_id=chat_id)
+            except Exception as e:
+                ok, err = False, str(e)
+            if not ok:
+                return False, err, i
+        return True, None, len(texts)
+
+    def _worker(self):
+        while True:
+            job = self.q.get()
+            try:
+                if job is _STOP:
+                    return
+                texts, parts, label, chat_id = job
+                ok, err, sent = self._send_all(texts, chat_id)
+                with self._count_lock:
+                    self.sent += sent
+                    if not ok:
+                        self.failed += 1
+                for text, on_ack, on_fail, part_label, key, meta in parts:
+                    if not ok and self.outbox is not None and key:
+                        if len(parts) == 1 and (len(texts) > 1 or "chunks" in (meta or {})):
+                            # Bölünmüş tek ilan: yalnızca gönderilmemiş parçalar saklanır
+                            meta = dict(meta or {}, chunks=texts[sent:])
+                        self.outbox.add(key, text, meta, err)
+                    try:
+                        if ok and on_ack:
+                            on_ack()
+                        elif not ok and on_fail:
+                            on_fail(err)
+                    except Exception:
+                        logging.exception(f"Bildirim geri çağrısı hata verdi: {part_label or label}")
+                    # State ack'te yazıldıktan sonra outbox'tan sil (arada çökme mesajı kaybetmesin)
+                    if ok and self.outbox is not None and key:
+                        self.outbox.remove(key)
+            finally:
+                self.q.task_done()
+
+    def close(self):
+        """Kuyruktaki tüm mesajlar gönderilene kadar bekler ve thread'leri durdurur."""
+        for _ in self._threads:
+            self.q.put(_STOP)
+        for t in self._threads:
+            t.join()
+        self._threads = []
+        logging.info(f"Bildirim kuyruğu kapandı: gönderilen={self.sent} başarısız={self.failed}")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
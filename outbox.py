@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Gönderilemeyen mesajlar için kalıcı giden kutusu
+- Outbox       : data/outbox.json (atomik yeniden yazım)
+- SqliteOutbox : data/outbox.db (WAL), kayıt başına upsert/silme
+- Anahtar: ilan id'si; değer: biçimlenmiş mesaj + onaylanınca state'e yazılacak kayıt
+- Her çalıştırmanın başında önce bu kutu boşaltılır; detay sayfası yeniden çekilmez
+- max_attempts / max_age_hours aşılan mesajlar atılır (ilan sonraki çalıştırmada yeni sayılır)
+"""
+
+import os
+import json
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timezone, timedelta
+
+OUTBOX_PATH = os.path.join("data", "outbox.json")
+OUTBOX_DB_PATH = os.path.join("data", "outbox.db")
+
+
+class _ExpiryMixin:
+    max_attempts = 0
+    max_age_hours = 0
+
+    def expire(self, now: datetime = None) -> list:
+        """Deneme sayısı ya da yaşı sınırı aşan mesajları siler; silinen anahtarları döner."""
+        now = now or datetime.now(timezone.utc)
+        dropped = []
+        for key, entry in self.pending():
+            too_many = self.max_attempts and int(entry.get("attempts") or 0) >= self.max_attempts
+            too_old = False
+            if self.max_age_hours and entry.get("created_at"):
+                try:
+                    created = datetime.fromisoformat(entry["created_at"])
+                    too_old = now - created > timedelta(hours=self.max_age_hours)
+                except ValueError:
+                    pass
+            if too_many or too_old:
+                self.remove(key)
+                dropped.append(key)
+                logging.warning(
+                    f"Outbox mesajı atıldı ({'deneme' if too_many else 'yaş'} sınırı): {key} "
+                    f"| son hata: {entry.get('last_error')}"
+                )
+        return dropped
+
+
+class Outbox(_ExpiryMixin):
+    def __init__(self, path: str = OUTBOX_PATH):
+        self.path = path
+        self.items = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            self.items = {}
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.items = json.load(f) or {}
+        except Exception as e:
+            logging.error(f"Outbox okunamadı ({self.path}): {e}")
+            self.items = {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.items, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def __contains__(self, key) -> bool:
+        return key in self.items
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def add(self, key: str, text: str, meta: dict = None, error: str = None):
+        """Mesajı ekler ya da deneme sayısını artırarak günceller."""
+        with self._lock:
+            prev = self.items.get(key) or {}
+            self.items[key] = {
+                "text": text,
+                "meta": meta if meta is not None else prev.get("meta"),
+                "created_at": prev.get("created_at") or datetime.now(timezone.utc).isoformat(),
+                "attempts": int(prev.get("attempts") or 0) + 1,
+                "last_error": error,
+            }
+            self._save()
+
+    def remove(self, key: str):
+        with self._lock:
+            if self.items.pop(key, None) is not None:
+                self._save()
+
+    def pending(self) -> list:
+        """(key, kayıt) listesi, en eskiden yeniye."""
+        with self._lock:
+            return sorted(self.items.items(), key=lambda kv: kv[1].get("created_at") or "")
+
+    def close(self):
+        pass
+
+
+class SqliteOutbox(_ExpiryMixin):
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS outbox (
+        key         TEXT PRIMARY KEY,
+        text        TEXT NOT NULL,
+        meta        TEXT,
+        created_at  TEXT,
+        attempts    INTEGER DEFAULT 0,
+        last_error  TEXT
+    );
+    """
+
+    def __init__(self, path: str = OUTBOX_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Gönderici thread'inden yazıldığı için check_same_thread=False + kilit
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+        self.conn.commit()
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM outbox WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def add(self, key: str, text: str, meta: dict = None, error: str = None):
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO outbox (key, text, meta, created_at, attempts, last_error) "
+                "VALUES (?, ?, ?, ?, 1, ?) "
+                "ON CONFLICT(key) DO UPDATE SET text=excluded.text, "
+                "meta=COALESCE(excluded.meta, outbox.meta), attempts=outbox.attempts + 1, "
+                "last_error=excluded.last_error",
+                (key, text, json.dumps(meta, ensure_ascii=False) if meta is not None else None, now, error),
+            )
+
+    def remove(self, key: str):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM outbox WHERE key = ?", (key,))
+
+    def pending(self) -> list:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT key, text, meta, created_at, attempts, last_error FROM outbox ORDER BY created_at"
+            ).fetchall()
+        return [
+            (key, {
+                "text": text,
+                "meta": json.loads(meta) if meta else None,
+                "created_at": created_at,
+                "attempts": attempts,
+                "last_error": last_error,
+            })
+            for key, text, meta, created_at, attempts, last_error in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def open_outbox(cfg: dict):
+    """config.yaml'daki outbox bloğuna göre (json | sqlite) giden kutusu döner."""
+    ocfg = cfg.get("outbox") or {}
+    backend = (ocfg.get("backend") or "json").strip().lower()
+    box = SqliteOutbox() if backend == "sqlite" else Outbox()
+    box.max_attempts = int(ocfg.get("max_attempts") or 0)
+    box.max_age_hours = float(ocfg.get("max_age_hours") or 0)
+    return box
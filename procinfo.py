@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Süreç bellek bilgisi (Linux /proc)
+- tree_rss_mb: bu süreç ve tüm alt süreçlerinin (Chromium dahil) anlık RSS toplamı
+- peak_rss_mb: bu sürecin tepe RSS değeri
+"""
+
+import os
+import sys
+
+try:
+    import resource
+except ImportError:  # Windows: resource modülü yok
+    resource = None
+
+
+def _read_proc_tree():
+    """pid -> (ppid, rss_kb) haritası; /proc yoksa boş döner."""
+    tree = {}
+    if not os.path.isdir("/proc"):
+        return tree
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/status", "r", encoding="utf-8") as f:
+                ppid, rss = 0, 0
+                for line in f:
+                    if line.startswith("PPid:"):
+                        ppid = int(line.split()[1])
+                    elif line.startswith("VmRSS:"):
+                        rss = int(line.split()[1])
+            tree[int(name)] = (ppid, rss)
+        except (OSError, ValueError):
+            pass
+    return tree
+
+
+def tree_rss_mb(pid: int = None):
+    """pid (varsayılan: bu süreç) ve torunlarının RSS toplamı (MB); ölçülemezse None."""
+    pid = pid or os.getpid()
+    tree = _read_proc_tree()
+    if pid not in tree:
+        return None
+    children = {}
+    for p, (ppid, _) in tree.items():
+        children.setdefault(ppid, []).append(p)
+    total, stack = 0, [pid]
+    while stack:
+        p = stack.pop()
+        total += tree.get(p, (0, 0))[1]
+        stack.extend(children.get(p, []))
+    return total / 1024
+
+
+def peak_rss_mb():
+    """Bu sürecin tepe RSS'i (MB); ölçülemezse None. Linux'ta ru_maxrss KB, macOS'ta bayttır."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
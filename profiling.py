@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+Aşama başına profil (scraper.py --profile)
+- cprofile : her aşama için ayrı cProfile; iç içe aşamada dıştaki duraklatılır, böylece
+             her fonksiyon çağrısı en içteki aşamaya yazılır. Çıktı <aşama>.prof
+             (snakeviz / flameprof / gprof2dot ile açılır) ve <aşama>.txt (ilk 30 satır).
+             Yalnızca profili başlatan thread profillenir (gönderici thread'ler hariç).
+- sample   : ek bağımlılık gerektirmeyen örnekleyici; interval_ms'de bir tüm thread'lerin
+             yığınını alır ve o thread'in en içteki aşamasına yazar. Çıktı <aşama>.folded
+             ve all.folded ("stage:<ad>" kökü ile): flamegraph.pl / speedscope / inferno
+             doğrudan okur.
+- Her iki modda stages.install_ipc_counter() açılır; aşama başına Playwright çağrı
+  sayıları (locator / evaluate / inner_text ...) stages.json'a ve loga yazılır.
+  run_scrape her çevrimde stages.stats'ı sıfırladığı için süre ve çağrı sayıları
+  sıfırlamadan önce profilin kendi toplamına aktarılır; daemon modunda stages.json da
+  .prof/.folded dosyaları gibi tüm çevrimleri kapsar.
+
+    python scraper.py --profile sample
+    python scraper.py --profile cprofile --profile-dir data/profile
+"""
+
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+
+import stages  # stages.py
+
+PROFILE_DIR = os.path.join("data", "profile")
+MODES = ("cprofile", "sample")
+
+
+def _safe_name(stage: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in stage)
+
+
+class CProfileListener:
+    """stages dinleyicisi: aşama başına cProfile, iç içe aşamalarda dıştakini duraklatır."""
+
+    def __init__(self):
+        self.thread = threading.get_ident()
+        self.active = []    # (aşama, Profile)
+        self.stats = {}     # aşama -> pstats.Stats
+
+    def stage_enter(self, name: str):
+        if threading.get_ident() != self.thread:
+            return
+        if self.active:
+            self.active[-1][1].disable()
+        prof = cProfile.Profile()
+        self.active.append((name, prof))
+        prof.enable()
+
+    def stage_exit(self, name: str):
+        if threading.get_ident() != self.thread or not self.active:
+            return
+        name, prof = self.active.pop()
+        prof.disable()
+        if name in self.stats:
+            self.stats[name].add(prof)
+        else:
+            self.stats[name] = pstats.Stats(prof)
+        if self.active:
+            self.active[-1][1].enable()
+
+    def write(self, out_dir: str) -> list:
+        paths = []
+        for name, st in self.stats.items():
+            base = os.path.join(out_dir, _safe_name(name))
+            st.dump_stats(base + ".prof")
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                st.stream = f
+                st.sort_stats("cumulative").print_stats(30)
+                st.stream = sys.stdout
+            paths.append(base + ".prof")
+        return paths
+
+
+class Sampler:
+    """Ayrı thread'de yığın örnekleyici; örnekleri aşama -> katlanmış yığın sayacına yazar."""
+
+    def __init__(self, stage_stats: stages.StageStats, interval_ms: float = 5):
+        self.stage_stats = stage_stats
+        self.interval = interval_ms / 1000.0
+        self.samples = {}   # aşama -> Counter(katlanmış yığın)
+        self.total = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    @staticmethod
+    def _fold(frame) -> str:
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(parts))
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self.stage_stats._lock:
+                stacks = [(tid, stack[-1:]) for tid, stack in self.stage_stats.stacks.items()]
+            for tid, top in stacks:
+                frame = frames.get(tid)
+                if not top or frame is None or tid == own:
+                    continue
+                stage = top[0]
+                self.samples.setdefault(stage, Counter())[self._fold(frame)] += 1
+                self.total += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, out_dir: str) -> list:
+        paths = []
+        with open(os.path.join(out_dir, "all.folded"), "w", encoding="utf-8") as combined:
+            for name, counter in self.samples.items():
+                path = os.path.join(out_dir, _safe_name(name) + ".folded")
+                with open(path, "w", encoding="utf-8") as f:
+                    for folded, n in counter.most_common():
+                        f.write(f"{folded} {n}\n")
+                        combined.write(f"stage:{name};{folded} {n}\n")
+                paths.append(path)
+        return paths
+
+
+class Profiler:
+    """--profile: aşama dinleyicisini + Playwright çağrı sayacını kurar, sonunda dosyaları yazar."""
+
+    def __init__(self, mode: str = "sample", out_dir: str = PROFILE_DIR, interval_ms: float = 5,
+                 stage_stats: stages.StageStats = None):
+        if mode not in MODES:
+            raise ValueError(f"Bilinmeyen profil modu: {mode} ({', '.join(MODES)})")
+        self.mode = mode
+        self.stage_stats = stage_stats or stages.stats
+        self.out_dir = os.path.join(out_dir, datetime.now().strftime("%Y%m%d-%H%M%S"))
+        self.listener = CProfileListener() if mode == "cprofile" else None
+        self.sampler = Sampler(self.stage_stats, interval_ms) if mode == "sample" else None
+        self.totals = stages.StageStats()   # çevrimler arası birikmiş süre / çağrı sayıları
+        self.cycles = 0
+        self.started = None
+
+    def _on_reset(self, durations: dict, ipc: dict):
+        if durations or ipc:
+            self.totals.merge(durations, ipc)
+            self.cycles += 1
+
+    def start(self):
+        if not stages.install_ipc_counter(self.stage_stats):
+            logging.warning("Playwright bulunamadı; IPC çağrıları sayılmayacak.")
+        if self.listener:
+            self.stage_stats.listeners.append(self.listener)
+        # Profil öncesi ölçümler toplama karışmasın
+        self.stage_stats.reset()
+        self.stage_stats.reset_hooks.append(self._on_reset)
+        if self.sampler:
+            self.sampler.start()
+        self.started = time.perf_counter()
+        return self
+
+    def stop(self) -> str:
+        """Profili durdurur, dosyaları yazar ve çıktı dizinini döner."""
+        if self.sampler:
+            self.sampler.stop()
+        if self.listener in self.stage_stats.listeners:
+            self.stage_stats.listeners.remove(self.listener)
+        if self._on_reset in self.stage_stats.reset_hooks:
+            self.stage_stats.reset_hooks.remove(self._on_reset)
+        stages.uninstall_ipc_counter()
+        # Son (sıfırlanmamış) çevrim de toplama eklenir
+        with self.stage_stats._lock:
+            durations = {k: list(v) for k, v in self.stage_stats.durations.items()}
+            ipc = {k: dict(v) for k, v in self.stage_stats.ipc.items()}
+        self._on_reset(durations, ipc)
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        paths = (self.listener or self.sampler).write(self.out_dir)
+        summary = self.totals.summary()
+        with open(os.path.join(self.out_dir, "stages.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "mode": self.mode,
+                "wall_ms": round((time.perf_counter() - self.started) * 1000, 1),
+                "cycles": self.cycles,
+                "samples": self.sampler.total if self.sampler else None,
+                "stages": summary,
+            }, f, indent=2, ensure_ascii=False)
+
+        ipc = sorted(((s["ipc"]["total"], name) for name, s in summary.items() if "ipc" in s), reverse=True)
+        if ipc:
+            logging.info("Playwright çağrıları: " + " ".join(f"{name}={n}" for n, name in ipc))
+        logging.info(f"Profil ({self.mode}): {len(paths)} aşama dosyası → {self.out_dir}")
+        return self.out_dir
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Olay güdümlü sayfa hazır olma beklemeleri
+- Sabit wait_for_timeout yerine somut sinyalleri bekler:
+    * link sayısının sabitlenmesi
+    * ağın boşa çıkması (üst sınırlı)
+    * Türkçe tarih aralığı içeren <li> görünmesi
+- Her beklemenin gerçekte ne kadar sürdüğü WaitStats'e yazılır
+"""
+
+import time
+import logging
+
+# tr_dates.py desenlerinin kaba JS karşılığı: "24 Kasım – 01 Aralık", "24-30 Kasım", "24.11.2025 - 01.12.2025"
+DATE_LI_JS = r"""
+() => {
+    const re = /\d{1,2}\s+[A-Za-zÇĞİÖŞÜçğıöşü]+\s*(\d{4})?\s*[–—\-]\s*\d{1,2}\s+[A-Za-zÇĞİÖŞÜçğıöşü]+|\d{1,2}\s*[–—\-]\s*\d{1,2}\s+[A-Za-zÇĞİÖŞÜçğıöşü]+|\d{1,2}[.\/]\d{1,2}[.\/]\d{2,4}/i;
+    for (const li of document.querySelectorAll('ul li')) {
+        if (re.test(li.textContent || '')) return true;
+    }
+    return false;
+}
+"""
+
+POLL_MS = 250
+
+
+class WaitStats:
+    """Bekleme adı -> süre (ms) listesi. Çalıştırma sonunda özet loglanır."""
+
+    def __init__(self):
+        self.waits = {}
+
+    def record(self, name: str, ms: float):
+        self.waits.setdefault(name, []).append(ms)
+
+    def total_ms(self) -> float:
+        return sum(sum(v) for v in self.waits.values())
+
+    def summary(self) -> dict:
+        return {
+            name: {"count": len(v), "total_ms": round(sum(v)), "max_ms": round(max(v))}
+            for name, v in self.waits.items()
+        }
+
+    def log_summary(self):
+        for name, s in self.summary().items():
+            logging.info(f"Bekleme [{name}] adet={s['count']} toplam={s['total_ms']}ms en uzun={s['max_ms']}ms")
+
+    def reset(self):
+        self.waits.clear()
+
+
+stats = WaitStats()
+
+
+def _elapsed_ms(t0: float) -> float:
+    return (time.monotonic() - t0) * 1000
+
+
+def wait_for_link_count_stable(page, selector: str, max_ms: int, stable_polls: int = 2,
+                               stats: WaitStats = stats, name: str = "links_stable") -> int:
+    """
+    selector ile eşleşen eleman sayısı art arda stable_polls yoklamada değişmeyene kadar
+    (en fazla max_ms) bekler. Son sayıyı döner.
+    """
+    t0 = time.monotonic()
+    last, same = -1, 0
+    while True:
+        try:
+            count = page.locator(selector).count()
+        except Exception:
+            count = last
+        if count == last and count > 0:
+            same += 1
+            if same >= stable_polls:
+                break
+        else:
+            same = 0
+        last = count
+        if _elapsed_ms(t0) >= max_ms:
+            break
+        page.wait_for_timeout(POLL_MS)
+    stats.record(name, _elapsed_ms(t0))
+    return last
+
+
+def wait_for_network_idle(page, max_ms: int, stats: WaitStats = stats, name: str = "network_idle") -> bool:
+    """Ağ boşa çıkana kadar (en fazla max_ms) bekler; süre dolduysa False döner."""
+    t0 = time.monotonic()
+    try:
+        page.wait_for_load_state("networkidle", timeout=max_ms)
+        ok = True
+    except Exception:
+        ok = False
+    stats.record(name, _elapsed_ms(t0))
+    return ok
+
+
+def wait_for_date_items(page, max_ms: int, stats: WaitStats = stats, name: str = "date_items") -> bool:
+    """Tarih aralığı içeren bir <li> görünene kadar (en fazla max_ms) bekler."""
+    t0 = time.monotonic()
+    try:
+        page.wait_for_function(DATE_LI_JS, timeout=max_ms, polling=POLL_MS)
+        ok = True
+    except Exception:
+        ok = False
+    stats.record(name, _elapsed_ms(t0))
+    return ok
+
+
+async def wait_for_date_items_async(page, max_ms: int, stats: WaitStats = stats,
+                                    name: str = "date_items") -> bool:
+    """wait_for_date_items'in playwright.async_api karşılığı."""
+    t0 = time.monotonic()
+    try:
+        await page.wait_for_function(DATE_LI_JS, timeout=max_ms, polling=POLL_MS)
+        ok = True
+    except Exception:
+        ok = False
+    stats.record(name, _elapsed_ms(t0))
+    return ok
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Playwright istek filtreleme
+- Kaynak tipine (image, font, media, ...) ve alan adı izin/engel listelerine göre
+  istekleri route üzerinden iptal eder
+- Çalıştırma başına engellenen istek sayısı ve indirilen bayt sayacı tutar
+  (iptal edilen isteğin boyutu bilinmediğinden yalnızca indirilenler bayt olarak sayılır)
+- Sayaçlar hem ana thread'in route geri çağrılarından hem detay havuzunun olay döngüsü
+  thread'inden artırıldığı için kilitle korunur
+"""
+
+import logging
+import threading
+from urllib.parse import urlparse
+
+DEFAULT_BLOCK_TYPES = ["image", "font", "media"]
+
+DEFAULT_DENY_DOMAINS = [
+    "googletagmanager.com",
+    "google-analytics.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "adservice.google.com",
+    "facebook.net",
+    "connect.facebook.net",
+    "hotjar.com",
+    "clarity.ms",
+    "yandex.ru",
+    "criteo.com",
+    "taboola.com",
+    "outbrain.com",
+]
+
+
+def _domain_match(host: str, domains) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+class ResourceFilter:
+    def __init__(self, block_types=None, deny_domains=None, allow_domains=None):
+        self.block_types = set(DEFAULT_BLOCK_TYPES if block_types is None else block_types)
+        self.deny_domains = [d.lower() for d in (DEFAULT_DENY_DOMAINS if deny_domains is None else deny_domains)]
+        self.allow_domains = [d.lower() for d in (allow_domains or [])]
+        self.blocked = {}          # sebep -> adet
+        self.allowed_requests = 0
+        self.downloaded_bytes = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, cfg: dict):
+        """config.yaml'daki resource_filter bloğundan oluşturur; kapalıysa None döner."""
+        rf = cfg.get("resource_filter") or {}
+        if not rf.get("enabled", True):
+            return None
+        return cls(
+            block_types=rf.get("block_types"),
+            deny_domains=rf.get("deny_domains"),
+            allow_domains=rf.get("allow_domains"),
+        )
+
+    def block_reason(self, url: str, resource_type: str):
+        """İstek engellenecekse sebebini ('type:image', 'deny:...'), değilse None döner."""
+        host = (urlparse(url).hostname or "").lower()
+        if self.allow_domains:
+            if not _domain_match(host, self.allow_domains):
+                return f"not_allowed:{host}"
+        elif _domain_match(host, self.deny_domains):
+            return f"deny:{host}"
+        if resource_type in self.block_types:
+            return f"type:{resource_type}"
+        return None
+
+    def _count(self, reason):
+        if reason:
+            # tip bazında ayrı ayrı, alan adı engellerinde toplu say
+            key = reason if reason.startswith("type:") else reason.split(":", 1)[0]
+            with self._lock:
+                self.blocked[key] = self.blocked.get(key, 0) + 1
+        else:
+            with self._lock:
+                self.allowed_requests += 1
+
+    def _on_response(self, response):
+        try:
+            size = int(response.headers.get("content-length") or 0)
+        except Exception:
+            return
+        with self._lock:
+            self.downloaded_bytes += size
+
+    # ---- sync_api ----
+    def _handle(self, route, request):
+        reason = self.block_reason(request.url, request.resource_type)
+        self._count(reason)
+        if reason:
+            route.abort()
+        else:
+            route.continue_()
+
+    def install(self, context):
+        """sync_api BrowserContext'e route ve response dinleyicisi ekler."""
+        context.route("**/*", self._handle)
+        context.on("response", self._on_response)
+
+    # ---- async_api ----
+    async def _handle_async(self, route, request):
+        reason = self.block_reason(request.url, request.resource_type)
+        self._count(reason)
+        if reason:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def install_async(self, context):
+        """async_api BrowserContext'e route ve response dinleyicisi ekler."""
+        await context.route("**/*", self._handle_async)
+        context.on("response", self._on_response)
+
+    def _reset_locked(self):
+        self.blocked = {}
+        self.allowed_requests = 0
+        self.downloaded_bytes = 0
+
+    def reset(self):
+        """Sayaçları sıfırlar (daemon modunda her çevrim sonunda)."""
+        with self._lock:
+            self._reset_locked()
+
+    def blocked_requests(self) -> int:
+        with self._lock:
+            return sum(self.blocked.values())
+
+    def log_summary(self, reset: bool = False):
+        """Sayaçları tek seferde okuyup loglar; reset=True ise aynı kilit altında sıfırlar."""
+        with self._lock:
+            blocked = dict(self.blocked)
+            allowed, downloaded = self.allowed_requests, self.downloaded_bytes
+            if reset:
+                self._reset_locked()
+        detail = ", ".join(f"{k}={v}" for k, v in sorted(blocked.items())) or "-"
+        logging.info(
+            f"İstek filtresi: engellenen={sum(blocked.values())} ({detail}) "
+            f"izin verilen={allowed} indirilen={downloaded / 1024:.0f} KB"
+        )
@@ -5,7 +5,9 @@
 ucuzaucak.net DOM scraping (Playwright)
 - Ana sayfa: ilan kartlarını DOM yüklendikten sonra bulur
 - Detay sayfası: görünen tarih maddelerini toplar
-- state.json ile idempotent
+- engine: http → tarayıcısız çekim (http_engine.py), kart yoksa Playwright'a düşer
+- --daemon: tek süreçte sürekli çalışma, sıcak tarayıcı (run_daemon)
+- state.json / state.db ile idempotent (state_store.py)
 - config.yaml ile filtreleme + mesaj şablonu
 - Telegram’a gönderim: telegram.py
 """
@@ -14,21 +16,43 @@ import os
 import re
 import json
 import time
+import signal
+import shutil
+import tempfile
+import threading
+import argparse
 import yaml
-import unicodedata
-from dateutil.parser import parse as dtparse
 import random
 import logging
 from datetime import datetime, timezone
 from urllib.parse import urljoin
 
-from telegram import send_message  # telegram.py
+import http_engine  # http_engine.py
+import detail_pool  # detail_pool.py
+import readiness  # readiness.py
+import stages  # stages.py
+import procinfo  # procinfo.py
+import metrics  # metrics.py
+import profiling  # profiling.py
+import state_store  # state_store.py
+import dedup  # dedup.py
+from notify_queue import NotificationQueue  # notify_queue.py
+import outbox  # outbox.py
+import subscribers  # subscribers.py
+import digest  # digest.py
+from textnorm import normalize_tr  # textnorm.py
+from tr_dates import parse_date_line, tr_format_date  # tr_dates.py
+from filter_index import FilterIndex  # filter_index.py
+from resource_filter import ResourceFilter  # resource_filter.py
+import telegram  # telegram.py
+from telegram import send_message
 from playwright.sync_api import sync_playwright, TimeoutError as PwTimeout
 
 # =========================
 #  AYARLAR
 # =========================
-BASE_URL = "https://ucuzaucak.net/"
+# UCUZAUCAK_BASE_URL: fikstür sunucusu gibi başka bir adrese yönlendirmek için (fixtures.py)
+BASE_URL = os.getenv("UCUZAUCAK_BASE_URL") or "https://ucuzaucak.net/"
 
 # ---- CSS/XPath/Heuristik Seçiciler ----
 # Site yapısı değişirse burada oynayacağız.
@@ -44,6 +68,9 @@ CARD_LOCATORS = [
 PRICE_RE = re.compile(r"(\d[\d\.\s]{1,12})\s?(?:TL|₺)", re.IGNORECASE)
 ARROW_RE = re.compile(r"(.+?)\s*(?:→|->|›|▶|–|-)\s*(.+)", re.UNICODE)
 
+# Mesaja yazılacak en fazla tarih satırı
+MAX_DATE_LINES = 50
+
 # 3) Detay sayfasındaki tarih listesi için seçiciler
 DETAIL_DATE_LOCATORS = [
     "ul li",          # klasik liste
@@ -53,10 +80,13 @@ DETAIL_DATE_LOCATORS = [
 
 # Playwright zaman aşımı (ms)
 NAV_TIMEOUT = 25_000
+# Hazır olma beklemelerinin üst sınırları (ms); sinyal gelirse daha erken biter
 WAIT_DOM_MS = 6_000
+WAIT_SCROLL_MS = 1_500
+WAIT_EXPAND_MS = 600
 
 # Dosya yolları
-STATE_PATH = os.path.join("data", "state.json")
+DATA_DIR = "data"
 CONFIG_PATH = "config.yaml"
 
 # Log
@@ -67,22 +97,7 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(
 #  YARDIMCI FONKSİYONLAR
 # =========================
 def ensure_dirs():
-    os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
-
-def load_state():
-    ensure_dirs()
-    if not os.path.exists(STATE_PATH):
-        return {"seen_ids": {}}
-    try:
-        with open(STATE_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {"seen_ids": {}}
-
-def save_state(state: dict):
-    ensure_dirs()
-    with open(STATE_PATH, "w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2, ensure_ascii=False)
+    os.makedirs(DATA_DIR, exist_ok=True)
 
 def load_config(path=CONFIG_PATH):
     with open(path, "r", encoding="utf-8") as f:
@@ -154,6 +169,7 @@ def infer_route_from_url(url: str):
 def expand_content(page):
     """
     Detay sayfada gizli kalan liste/tarih blokları için yaygın butonlara tıklar.
+    Tıklamadan sonra sabit süre yerine tarih <li>'si görünene kadar (en fazla WAIT_EXPAND_MS) bekler.
     """
     candidates = [
         'text="Devamını Oku"',
@@ -169,7 +185,7 @@ def expand_content(page):
         try:
             if page.locator(sel).first.is_visible():
                 page.locator(sel).first.click()
-                page.wait_for_timeout(600)
+                readiness.wait_for_date_items(page, WAIT_EXPAND_MS, name="expand")
         except Exception:
             pass
 
@@ -188,114 +204,36 @@ def extract_route(text: str):
 def make_id_from_url(url: str):
     return url  # URL benzersiz kabul
 
-def normalize_tr(s: str) -> str:
-    """
-    Türkçe karakter ve i/ı/İ normalizasyonu + aksan kaldırma + lower.
-    'İstanbul', 'ISTANBUL', 'ıstanbul' -> 'istanbul'
-    """
-    if not s:
-        return ""
-    s = s.replace("İ", "i").replace("I", "i").replace("ı", "i")
-    s = unicodedata.normalize("NFKD", s)
-    s = "".join(ch for ch in s if not unicodedata.combining(ch))
-    return s.lower().strip()
-
-# ------------------------------
-# Türkçe tarih ayrıştırma & biçimleme
-# ------------------------------
-TR_MONTHS_MAP = {
-    "ocak": 1, "şubat": 2, "subat": 2, "mart": 3, "nisan": 4, "mayıs": 5, "mayis": 5,
-    "haziran": 6, "temmuz": 7, "ağustos": 8, "agustos": 8, "eylül": 9, "eylul": 9,
-    "ekim": 10, "kasım": 11, "kasim": 11, "aralık": 12, "aralik": 12
-}
-TR_DAY_NAMES = ["Pazartesi","Salı","Çarşamba","Perşembe","Cuma","Cumartesi","Pazar"]
-
-def norm(s: str) -> str:
-    if not s: return ""
-    s = s.replace("İ","i").replace("I","i").replace("ı","i")
-    s = unicodedata.normalize("NFKD", s)
-    s = "".join(ch for ch in s if not unicodedata.combining(ch))
-    return s.lower().strip()
-
-def month_to_num(name: str) -> int:
-    return TR_MONTHS_MAP.get(norm(name), 0)
-
-def tr_format_date(dt: datetime) -> str:
-    # "24 Kasım Pazartesi" biçimi
-    ay_adı = list(TR_MONTHS_MAP.keys())[list(TR_MONTHS_MAP.values()).index(dt.month)]
-    # ay_adı listede "mayis" gibi de olabilir, güzel gösterelim:
-    pretty = {
-        "ocak":"Ocak","subat":"Şubat","şubat":"Şubat","mart":"Mart","nisan":"Nisan","mayis":"Mayıs","mayıs":"Mayıs",
-        "haziran":"Haziran","temmuz":"Temmuz","agustos":"Ağustos","ağustos":"Ağustos","eylul":"Eylül","eylül":"Eylül",
-        "ekim":"Ekim","kası m":"Kasım","kasim":"Kasım","kasım":"Kasım","aralik":"Aralık","aralık":"Aralık"
-    }.get(norm(ay_adı), ay_adı.capitalize())
-    gun = TR_DAY_NAMES[dt.weekday()]
-    return f"{dt.day:02d} {pretty} {gun}"
-
-def parse_tr_date(day_s: str, month_s: str, year_s: str = "") -> datetime:
-    d = int(day_s)
-    m = month_to_num(month_s)
-    if m == 0:
-        raise ValueError("Ay çözümlenemedi")
-    y = int(year_s) if year_s else datetime.utcnow().year
-    # yıl eksik ve ay geçmiş/yakın taşmalar olabilir → dtparse fallback kullan
-    try:
-        return datetime(y, m, d)
-    except Exception:
-        # dateutil ile şansımızı deneyelim
-        return dtparse(f"{d} {month_s} {y}", dayfirst=True)
-
-def parse_date_range_line(text: str):
-    """
-    '24 Kasım – 01 Aralık', '24 Kasım 2025 - 01 Aralık 2025' gibi satırları yakalar.
-    Dönüş: (start_dt, end_dt) veya None
-    """
-    import re
-    t = text.strip()
-    # iki uç tarih yakala (ay adları Türkçe)
-    # 1) 24 Kasım 2025 – 01 Aralık 2025
-    pat_full = re.compile(
-        r"(\d{1,2})\s+([A-Za-zÇĞİÖŞÜçğıöşü]+)\s*(\d{4})?\s*[–—\-]\s*(\d{1,2})\s+([A-Za-zÇĞİÖŞÜçğıöşü]+)\s*(\d{4})?",
-        re.IGNORECASE
-    )
-    m = pat_full.search(t)
-    if not m:
-        return None
-    d1, mon1, y1, d2, mon2, y2 = m.groups()
-    start = parse_tr_date(d1, mon1, y1 or "")
-    end   = parse_tr_date(d2, mon2, y2 or "")
-    # yıl/ay taşması küçük düzeltme: bitiş başlangıçtan önceyse +1 yıl dene
-    if end < start:
-        try:
-            end = end.replace(year=end.year + 1)
-        except Exception:
-            pass
-    return start, end
-
-def format_dates_lines_from_list(li_texts: list) -> list:
+def format_dates_lines_from_list(li_texts, limit: int = None) -> list:
     """
     <li> metinlerini alır, tarih aralıklarını parse edip
     '24 Kasım Pazartesi – 01 Aralık Pazartesi (7 Gün)' satırları üretir.
+    Yalnızca tek tarih içeren maddeler '24 Kasım Pazartesi' olarak yazılır.
+    - Aynı metin bir kez ayrıştırılır (başlık kovaları aynı <li>'yi birkaç kez getirebilir)
+    - Aynı (başlangıç, bitiş) aralığı bir kez yazılır
+    - Satırlar tarih sırasına dizilir; limit verilirse yalnızca ilk limit satır biçimlenir
     """
-    out = []
-    for raw in li_texts:
-        pr = parse_date_range_line(raw)
-        if not pr:
+    ranges = {}
+    for raw in dict.fromkeys(li_texts):
+        pr = parse_date_line(raw)
+        if not pr or pr in ranges:
             continue
         start, end = pr
-        days = (end - start).days
         # Gün sayısı 0 veya negatifse atla
-        if days <= 0:
+        if end is not None and (end - start).days <= 0:
             continue
-        left = tr_format_date(start)
-        right = tr_format_date(end)
-        out.append(f"{left} – {right} ({days} Gün)")
-    # benzersiz & sıralı
-    uniq = []
-    for line in out:
-        if line not in uniq:
-            uniq.append(line)
-    return uniq
+        ranges[pr] = None
+
+    ordered = sorted(ranges, key=lambda r: (r[0], r[1] or r[0]))
+    if limit:
+        ordered = ordered[:limit]
+    out = []
+    for start, end in ordered:
+        if end is None:
+            out.append(tr_format_date(start))
+        else:
+            out.append(f"{tr_format_date(start)} – {tr_format_date(end)} ({(end - start).days} Gün)")
+    return out
 
 def apply_filters(listings, cfg):
     filt = (cfg.get("filters") or {})
@@ -318,6 +256,23 @@ def apply_filters(listings, cfg):
     return out
 
 
+def match_subscribers(listings, subs):
+    """
+    Her ilanı tüm abonelerin filtreleriyle eşleştirir; eşleşen abone adlarını
+    it["subscribers"]'a yazar ve en az bir aboneye uyan ilanları sırayla döner.
+    Filtreler bir kez FilterIndex'e derlenir; ilan başına maliyet abone sayısından
+    değil, eşleşen kalıp sayısından etkilenir.
+    """
+    index = FilterIndex(subs, normalize_tr)
+    out = []
+    for it in listings:
+        names = index.match(it)
+        if names:
+            it["subscribers"] = names
+            out.append(it)
+    return out
+
+
 def format_message(item, dates_lines, cfg):
     """
     Çıktı biçimi:
@@ -352,7 +307,8 @@ def format_message(item, dates_lines, cfg):
     else:
         dates_block = "—"
 
-    lines = [
+    lines = [item["change_note"], ""] if item.get("change_note") else []
+    lines += [
         f"✈️ {origin} — {destination}",
         "",
         f"💳 Fiyat: {disp}",
@@ -368,23 +324,116 @@ def format_message(item, dates_lines, cfg):
 # =========================
 #  PLAYWRIGHT SCRAPERS
 # =========================
-def collect_cards(page):
+# Tek evaluate ile tüm /ucak-bileti/ linklerini (href, menü mü, metin) çeker.
+# Link başına ayrı get_attribute/evaluate/inner_text IPC turu yerine tek tur.
+COLLECT_LINKS_JS = """
+() => Array.from(document.querySelectorAll('a[href*="/ucak-bileti/"]')).map(a => ({
+    href: a.getAttribute('href') || '',
+    nav: !!a.closest('header, nav, footer, .site-footer, .elementor-nav-menu, .menu, .widget, aside'),
+    text: a.innerText || '',
+}))
+"""
+
+def parse_card_links(links: list) -> list:
+    """
+    COLLECT_LINKS_JS çıktısından (dict listesi: href, nav, text) ilan kartlarını üretir.
+    Gruplama, rota ve fiyat ayrıştırması tamamen Python tarafında yapılır.
+    """
+    # href -> o href'e sahip tüm linklerin metinleri (menüdekiler dahil, eski davranış)
+    groups = {}
+    order = []
+    ordered = set()
+    for ln in links:
+        href = ln.get("href") or ""
+        if not href:
+            continue
+        href = urljoin(BASE_URL, href)
+        groups.setdefault(href, [])
+        t = clean(ln.get("text") or "")
+        if t:
+            groups[href].append(t)
+
+        # Kategori/menü kökünü ve menü/başlık/altbilgi linklerini ele
+        if re.search(r"/ucak-bileti/?$", href):
+            continue
+        if ln.get("nav"):
+            continue
+        if href not in ordered:
+            ordered.add(href)
+            order.append(href)
+
+    items = []
+    for href in order:
+        item = card_from_texts(href, groups.get(href, []))
+        if item:
+            items.append(item)
+    return items
+
+def card_from_texts(href: str, texts: list):
+    """Aynı href'e ait link metinlerinden kart sözlüğü üretir; sinyal yoksa None."""
+    # Rota adayını bul (ok veya tire içeren)
+    route_text = ""
+    for t in texts:
+        if ("→" in t) or (" - " in t) or ARROW_RE.search(t):
+            route_text = t
+            break
+    origin, destination = extract_route(route_text)
+
+    # Rota metinden çıkmazsa URL'den dene
+    if not origin or not destination:
+        o2, d2 = infer_route_from_url(href)
+        origin = origin or o2
+        destination = destination or d2
+
+    # Fiyatı bul
+    price_text = ""
+    price_int = 0
+    for t in texts:
+        m = PRICE_RE.search(t)
+        if m:
+            price_text = clean(m.group(0))
+            price_int = parse_price_to_int(price_text)
+            break
+
+    # Çok zayıf sinyaller (ne rota ne fiyat) ise ele
+    if not origin and not destination and price_int == 0:
+        return None
+
+    return {
+        "id": make_id_from_url(href),
+        "url": href,
+        "origin": origin,
+        "destination": destination,
+        "price_text": price_text,
+        "price": price_int,
+        "posted_text": "",
+    }
+
+def collect_cards(page, bulk: bool = True):
     """
     Ana sayfada gerçek ilan kartlarını topla.
     Yöntem:
       - /ucak-bileti/ altındaki detay linklerini bul
       - header/nav/footer/menu içindeki linkleri dışla
       - aynı href'e sahip tüm linklerin metinlerinden rota ve fiyatı çıkar
+    bulk=True iken tüm linkler tek page.evaluate ile çekilir (varsayılan);
+    evaluate başarısız olursa link başına locator yöntemine düşer.
     """
-    items = []
-    seen_hrefs = set()
-
     # Linkler DOM'a gelsin
     try:
         page.wait_for_selector('a[href*="/ucak-bileti/"]', timeout=15000)
     except Exception:
         pass
 
+    if bulk:
+        try:
+            return parse_card_links(page.evaluate(COLLECT_LINKS_JS))
+        except Exception as e:
+            logging.warning(f"Toplu link çekimi başarısız, locator yöntemine geçiliyor: {e}")
+
+    items = []
+    seen_hrefs = set()
+
     links = page.locator('a[href*="/ucak-bileti/"]').all()
 
     for a in links:
@@ -423,44 +472,9 @@ def collect_cards(page):
             except Exception:
                 pass
 
-        # Rota adayını bul (ok veya tire içeren)
-        route_text = ""
-        for t in texts:
-            if ("→" in t) or (" - " in t) or ARROW_RE.search(t):
-                route_text = t
-                break
-        origin, destination = extract_route(route_text)
-
-        # Rota metinden çıkmazsa URL'den dene
-        if not origin or not destination:
-            o2, d2 = infer_route_from_url(href)
-            origin = origin or o2
-            destination = destination or d2
-
-
-        # Fiyatı bul
-        price_text = ""
-        price_int = 0
-        for t in texts:
-            m = PRICE_RE.search(t)
-            if m:
-                price_text = clean(m.group(0))
-                price_int = parse_price_to_int(price_text)
-                break
-
-        # Çok zayıf sinyaller (ne rota ne fiyat) ise ele
-        if not origin and not destination and price_int == 0:
-            continue
-
-        items.append({
-            "id": make_id_from_url(href),
-            "url": href,
-            "origin": origin,
-            "destination": destination,
-            "price_text": price_text,
-            "price": price_int,
-            "posted_text": "",
-        })
+        item = card_from_texts(href, texts)
+        if item:
+            items.append(item)
 
     return items
 
@@ -524,91 +538,566 @@ def collect_detail_dates(page):
                 pass
 
     # 3) Metinlerden tarih aralığı satırlarını üret
-    formatted = format_dates_lines_from_list(raw_items)
-    return formatted[:50]
+    return format_dates_lines_from_list(raw_items, MAX_DATE_LINES)
 
 
-def run_scrape():
-    cfg = load_config()
-    state = load_state()
-    seen = state.get("seen_ids", {})
-
-    with sync_playwright() as pw:
-        browser = pw.chromium.launch(headless=True)
-        context = browser.new_context(
-            user_agent=(
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/123.0 Safari/537.36"
-            ),
-            locale="tr-TR",
+def collect_cards_http(session):
+    """Ana sayfayı HTTP ile indirip collect_cards ile aynı kart listesini döner."""
+    with stages.stage("homepage"):
+        html = http_engine.fetch_html(session, BASE_URL)
+    with stages.stage("collect_cards"):
+        return parse_card_links(http_engine.extract_link_records(html))
+
+def dates_from_raw_items(raw_items: list) -> list:
+    """Ham <li> metinlerinden biçimlenmiş tarih satırlarını (en fazla 50) üretir."""
+    return format_dates_lines_from_list((clean(t) for t in raw_items), MAX_DATE_LINES)
+
+def collect_detail_dates_http(session, url: str):
+    """Detay sayfasını HTTP ile indirip collect_detail_dates ile aynı satırları döner."""
+    html = http_engine.fetch_html(session, url)
+    with stages.stage("collect_detail_dates"):
+        return dates_from_raw_items(http_engine.extract_date_items(html))
+
+def select_new_items(listings, cfg, store, fanout):
+    """
+    Kartları loglar, abone filtreleriyle eşleştirir ve state'te görülmemiş olanları döner.
+    fanout.pending_ids: outbox'ta gönderilmeyi bekleyen ilanlar (detayları yeniden çekilmez).
+    """
+    pending = fanout.pending_ids
+    seen = store.seen
+    # Ana sayfada hâlâ duran ilanların last_seen'i tazelenir (saklama politikası LRU'su için)
+    store.touch([it["id"] for it in listings if it["id"] in seen])
+
+    # Örnek ilk 5 kartı logla (rota, fiyat, url)
+    for i, it in enumerate(listings[:5], 1):
+        logging.info(f"[Örnek {i}] {it.get('origin')} -> {it.get('destination')} | {it.get('price_text')} | {it.get('url')}")
+
+    logging.info(f"Ana sayfada bulunan kart sayısı: {len(listings)}")
+    metrics.count("cards_found", len(listings), "Ana sayfada bulunan kart")
+
+    with stages.stage("filter"):
+        filtered = match_subscribers(listings, fanout.subscribers.values())
+    logging.info(f"Filtre sonrası {len(filtered)} ilan kaldı ({len(fanout.subscribers)} abone).")
+    metrics.count("cards_filtered", len(filtered), "Abone filtrelerinden geçen ilan")
+
+    # Yeni ilanlar + fiyatı değişip yeniden bildirim kuralına takılanlar detaya gider
+    rules = dedup.RenotifyRules.from_config(cfg)
+    new_items = []
+    for it in filtered:
+        if it["id"] in pending:
+            continue
+        change = dedup.classify(it, seen.get(it["id"]), rules)
+        if change == dedup.PRICE_UP:
+            # Bildirilen fiyatın altına inmeyen değişim: yalnızca son görülen fiyat güncellenir
+            store.mark_seen(it["id"], dedup.refresh_price(seen[it["id"]], it))
+        elif change:
+            it["change"] = change
+            new_items.append(it)
+    changed = sum(1 for it in new_items if it["change"] != dedup.NEW)
+    logging.info(f"Yeni ilan sayısı: {len(new_items) - changed} (+{changed} fiyatı değişen)")
+    metrics.count("new_items", len(new_items), "Detaya giden yeni / fiyatı değişen ilan")
+    return new_items
+
+def change_note(item, entry, dates) -> str:
+    """
+    Yeniden bildirimde mesajın başına eklenecek not.
+    RECHECK iken yeni tarih aralığı yoksa None döner (bildirilmez).
+    """
+    change = item.get("change") or dedup.NEW
+    if change == dedup.NEW:
+        return ""
+    # Karşılaştırma aboneye en son bildirilen fiyatla
+    old_price = f"{dedup.notified_price(entry):,}".replace(",", ".")
+    new_price = f"{int(item.get('price') or 0):,}".replace(",", ".")
+    if change == dedup.PRICE_DROP:
+        return f"🔻 Fiyat düştü: {old_price} TL → {new_price} TL"
+    if "date_keys" not in entry:
+        # Tarih kümesi tutulmadan önce yazılmış kayıt: tarihleri sessizce kaydet
+        return None
+    added = dedup.added_dates(entry, dates)
+    if not added:
+        return None
+    return f"🆕 Yeni tarihler eklendi ({len(added)}), fiyat: {old_price} TL → {new_price} TL"
+
+def deliver_item(item, dates, cfg, store, fanout) -> bool:
+    """
+    Mesajı biçimler ve eşleşen her abone için gönderim kuyruğuna koyar; state,
+    ilk gönderim onaylanınca (gönderici thread'inde) yazılır. Kuyruğa girdiyse True döner.
+    """
+    entry = store.seen.get(item["id"]) or {}
+    if item.get("change", dedup.NEW) != dedup.NEW and not dates:
+        # Detay alınamadı: kayıt (fiyat, tarih kümesi) olduğu gibi kalır, sonraki çevrimde tekrar denenir
+        logging.warning(f"Tarihler alınamadı, yeniden bildirim ertelendi: {item['url']}")
+        return False
+    now = datetime.now(timezone.utc).isoformat()
+    record = {"first_seen": entry.get("first_seen") or now, "last_seen": now}
+    note = change_note(item, entry, dates)
+    record.update(dedup.entry_fields(item, dates, notified=note is not None))
+    if note is None:
+        # Fiyat değişmiş ama yeni tarih yok: bildirmeden kaydı güncelle (bildirilen fiyat aynı kalır)
+        record["notified_price"] = dedup.notified_price(entry)
+        logging.info(f"Yeni tarih yok, sessizce güncellendi: {item['url']}")
+        store.mark_seen(item["id"], record)
+        return False
+    item["change_note"] = note
+
+    with stages.stage("format_message"):
+        msg = format_message(item, dates, cfg)
+
+    for name in item.get("subscribers") or list(fanout.subscribers):
+
+        def on_ack(name=name):
+            record["notified_at"] = datetime.now(timezone.utc).isoformat()
+            store.mark_seen(item["id"], record)
+            logging.info(f"Telegram'a gönderildi [{name}]: {item['url']}")
+
+        def on_fail(err, name=name):
+            logging.error(f"Telegram gönderim hatası [{name}]: {err}")
+
+        fanout.submit(name, item["id"], msg, record, on_ack=on_ack, on_fail=on_fail, label=item["url"])
+    return True
+
+def drain_outbox(fanout, store) -> set:
+    """
+    Önceki çalıştırmalardan kalan gönderilmemiş mesajları kazımadan önce kuyruğa koyar
+    (özet tamponu atlanır, doğrudan ilgili sohbete). Onaylananların kaydı state'e yazılır;
+    yine başarısız olanlar outbox'ta kalır. Bekleyen ilan id'lerini döner.
+    """
+    if fanout.outbox is None:
+        return set()
+    fanout.outbox.expire()
+    pending = fanout.outbox.pending()
+    if not pending:
+        return set()
+    logging.info(f"Outbox'ta bekleyen {len(pending)} mesaj yeniden gönderiliyor...")
+    ids = set()
+    for key, entry in pending:
+        meta = entry.get("meta") or {}
+        if "record" not in meta:
+            # Abonelik öncesi biçim: meta doğrudan kayıttır, anahtar ilan id'sidir
+            meta = {"item_id": key, "chat_id": None, "record": meta}
+        item_id, record = meta["item_id"], meta["record"]
+        ids.add(item_id)
+
+        def on_ack(key=key, item_id=item_id, record=record):
+            record["notified_at"] = datetime.now(timezone.utc).isoformat()
+            store.mark_seen(item_id, record)
+            logging.info(f"Outbox'tan gönderildi: {key}")
+
+        # Sınırı aşan ilan parçalar halinde gider; yarıda kalmışsa yalnızca kalan parçalar
+        chunks = meta.get("chunks") or digest.split_long(entry["text"])
+        fanout.notifier.submit_batch(chunks, [(entry["text"], on_ack, None, key, key, meta)],
+                                     label=key, chat_id=meta.get("chat_id") or None)
+    return ids
+
+def process_listings(listings, cfg, store, fanout, fetch_dates):
+    """
+    Kartları filtreler, yeni olanların detayını fetch_dates(item) ile sırayla çeker
+    ve mesajları gönderim kuyruğuna koyar. Yeni ilan listesini döner.
+    """
+    new_items = select_new_items(listings, cfg, store, fanout)
+    # Nazik olun: detaylar arası varsayılan 1–3 sn bekle (fikstür/kıyaslamada 0)
+    delay_min, delay_max = cfg.get("detail_delay") or (1.0, 3.0)
+
+    for idx, item in enumerate(new_items, 1):
+        try:
+            time.sleep(random.uniform(float(delay_min), float(delay_max)))
+            logging.info(f"Detay sayfasına gidiliyor: {item['url']}")
+            with stages.stage("detail"):
+                dates = fetch_dates(item)
+        except PwTimeout:
+            logging.warning("Detay sayfası zaman aşımı.")
+            dates = []
+        except Exception as e:
+            logging.warning(f"Detay sayfası hata: {e}")
+            dates = []
+
+        if deliver_item(item, dates, cfg, store, fanout):
+            logging.info(f"[{idx}/{len(new_items)}] Gönderim kuyruğuna eklendi.")
+
+    return new_items
+
+def process_details_concurrently(new_items, cfg, store, fanout, concurrency: int, pool):
+    """
+    Yeni ilanların detay sayfalarını detail_pool.DetailPool ile eşzamanlı çeker;
+    her sonuç geldiği anda gönderim kuyruğuna konur.
+    """
+    done = [0]
+
+    def on_result(item, raw_items, err):
+        done[0] += 1
+        if err is not None:
+            logging.warning(f"Detay sayfası hata: {item['url']} | {err}")
+        if deliver_item(item, dates_from_raw_items(raw_items), cfg, store, fanout):
+            logging.info(f"[{done[0]}/{len(new_items)}] Gönderim kuyruğuna eklendi.")
+
+    logging.info(f"{len(new_items)} detay sayfası {concurrency} eşzamanlı sayfayla çekiliyor...")
+    with stages.stage("detail_stage"):
+        pool.run(
+            new_items, on_result,
+            concurrency=concurrency,
+            min_interval=float(cfg.get("detail_min_interval", 0.5)),
+            nav_timeout=NAV_TIMEOUT,
+            wait_ms=WAIT_DOM_MS,
+            expand_wait_ms=WAIT_EXPAND_MS,
         )
-        page = context.new_page()
 
-        logging.info("Ana sayfa açılıyor...")
-        page.goto(BASE_URL, timeout=NAV_TIMEOUT, wait_until="domcontentloaded")
-        page.wait_for_selector('a[href*="/ucak-bileti/"]', timeout=15000)
-        page.wait_for_timeout(1000)  # minik tampon
-        # Biraz bekle ki JS listeyi doldursun
-        page.wait_for_timeout(WAIT_DOM_MS)
+def run_scrape_http(cfg, store, fanout):
+    """
+    Tarayıcısız çalıştırma. Statik ayrıştırma kart bulamazsa None döner
+    (çağıran Playwright'a düşer); aksi halde yeni ilan listesini döner.
+    """
+    session = http_engine.make_session()
+    try:
+        logging.info("Ana sayfa HTTP ile indiriliyor...")
+        try:
+            listings = collect_cards_http(session)
+        except Exception as e:
+            logging.warning(f"HTTP ana sayfa hatası: {e}")
+            listings = []
+        if not listings:
+            logging.warning("Statik ayrıştırma kart bulamadı, Playwright'a geçiliyor.")
+            return None
+        return process_listings(
+            listings, cfg, store, fanout,
+            lambda item: collect_detail_dates_http(session, item["url"]),
+        )
+    finally:
+        session.close()
 
-        # Bazı siteler scroll sonrası yükler
+def _devtools_endpoint(profile_dir: str, timeout: float = 10.0) -> str:
+    """
+    --remote-debugging-port=0 ile açılan Chromium'un seçtiği port ve tarayıcı GUID'li
+    websocket yolu profil dizinindeki DevToolsActivePort dosyasından okunur.
+    """
+    path = os.path.join(profile_dir, "DevToolsActivePort")
+    deadline = time.monotonic() + timeout
+    while True:
         try:
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            page.wait_for_timeout(1500)
-        except Exception:
+            with open(path, "r", encoding="utf-8") as f:
+                lines = f.read().split()
+            if len(lines) >= 2:
+                return f"ws://127.0.0.1:{int(lines[0])}{lines[1]}"
+        except (OSError, ValueError):
             pass
+        if time.monotonic() >= deadline:
+            raise RuntimeError("Chromium DevTools uç noktası okunamadı.")
+        time.sleep(0.05)
 
-        listings = collect_cards(page)
-        # Örnek ilk 5 kartı logla (rota, fiyat, url)
-        for i, it in enumerate(listings[:5], 1):
-            logging.info(f"[Örnek {i}] {it.get('origin')} -> {it.get('destination')} | {it.get('price_text')} | {it.get('url')}")
-
-        logging.info(f"Ana sayfada bulunan kart sayısı: {len(listings)}")
+class BrowserSession:
+    """
+    sync_playwright + tarayıcı + context + tek sayfa.
+    detail_concurrency > 1 ise tarayıcı geçici profil dizinli kalıcı context olarak,
+    işletim sisteminin seçtiği bir CDP portuyla (--remote-debugging-port=0) açılır;
+    eşzamanlı detay havuzu (detail_pool.DetailPool) DevToolsActivePort'tan okunan
+    uç noktayla aynı Chromium'a bağlanır, ikinci tarayıcı başlatılmaz.
+    Tek seferlik çalıştırmada her run'da açılıp kapanır; daemon modunda
+    çevrimler arasında sıcak tutulur ve gerektiğinde yenilenir.
+    """
 
-        filtered = apply_filters(listings, cfg)
-        logging.info(f"Filtre sonrası {len(filtered)} ilan kaldı.")
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.pw = None
+        self.browser = None
+        self.context = None
+        self.page = None
+        self.rfilter = None
+        self.cdp_url = None
+        self.profile_dir = None
+        self.pool = None
+        self.cycles = 0
+
+    @property
+    def started(self) -> bool:
+        return self.context is not None
+
+    def start(self):
+        if self.started:
+            return self
+        with stages.stage("browser_launch"):
+            self.pw = sync_playwright().start()
+            if int(self.cfg.get("detail_concurrency") or 1) > 1:
+                # Port önceden seçilmez (yarış yok); Chromium'un açtığı port profil dizininden okunur
+                self.profile_dir = tempfile.mkdtemp(prefix="ucuz-chromium-")
+                self.context = self.pw.chromium.launch_persistent_context(
+                    self.profile_dir,
+                    headless=True,
+                    args=["--remote-debugging-port=0"],
+                    user_agent=http_engine.USER_AGENT,
+                    locale="tr-TR",
+                )
+                self.cdp_url = _devtools_endpoint(self.profile_dir)
+            else:
+                self.browser = self.pw.chromium.launch(headless=True)
+                self.context = self.browser.new_context(
+                    user_agent=http_engine.USER_AGENT,
+                    locale="tr-TR",
+                )
+            # Görsel, font, reklam ve izleyicileri indirme
+            self.rfilter = ResourceFilter.from_config(self.cfg)
+            if self.rfilter:
+                self.rfilter.install(self.context)
+            self.page = self.context.pages[0] if self.context.pages else self.context.new_page()
+        self.cycles = 0
+        return self
+
+    def detail_pool(self) -> detail_pool.DetailPool:
+        """Bu tarayıcıya bağlı (çevrimler arası sıcak) eşzamanlı detay havuzu."""
+        if self.pool is None:
+            with stages.stage("browser_launch"):
+                self.pool = detail_pool.DetailPool(
+                    self.cdp_url, user_agent=http_engine.USER_AGENT, resource_filter=self.rfilter,
+                ).start()
+        return self.pool
+
+    def close(self):
+        for closer in (
+            lambda: self.pool and self.pool.close(),
+            lambda: self.context and self.context.close(),
+            lambda: self.browser and self.browser.close(),
+            lambda: self.pw and self.pw.stop(),
+        ):
+            try:
+                closer()
+            except Exception as e:
+                logging.warning(f"Tarayıcı kapatılırken hata: {e}")
+        if self.profile_dir:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+        self.pw = self.browser = self.context = self.page = self.pool = self.cdp_url = None
+        self.profile_dir = None
+
+def run_scrape_playwright(cfg, store, fanout, session: BrowserSession = None):
+    concurrency = int(cfg.get("detail_concurrency") or 1)
+    own_session = session is None
+    session = session or BrowserSession(cfg)
+    if concurrency > 1 and session.started and not session.cdp_url:
+        # detail_concurrency sonradan açıldı: tarayıcı CDP portuyla yeniden başlatılır
+        session.close()
+    session.start()
+    session.cycles += 1
+    rfilter = session.rfilter
+    try:
+        page = session.page
 
-        new_items = [it for it in filtered if it["id"] not in seen]
-        logging.info(f"Yeni ilan sayısı: {len(new_items)}")
+        logging.info("Ana sayfa açılıyor...")
+        with stages.stage("homepage"):
+            page.goto(BASE_URL, timeout=NAV_TIMEOUT, wait_until="domcontentloaded")
+            page.wait_for_selector('a[href*="/ucak-bileti/"]', timeout=15000)
+            # JS listeyi doldurana kadar: link sayısı sabitlenince devam
+            readiness.wait_for_link_count_stable(page, 'a[href*="/ucak-bileti/"]', WAIT_DOM_MS)
 
-        for idx, item in enumerate(new_items, 1):
+            # Bazı siteler scroll sonrası yükler
             try:
-                # Nazik olun: 1–3 sn bekle
-                time.sleep(random.uniform(1.0, 3.0))
-                logging.info(f"Detay sayfasına gidiliyor: {item['url']}")
-                page.goto(item["url"], timeout=NAV_TIMEOUT, wait_until="domcontentloaded")
-                page.wait_for_timeout(WAIT_DOM_MS)
-                expand_content(page)
-                # Bazı sayfalar “devamını oku” tarzı gizleme kullanabilir
-                dates = collect_detail_dates(page)
-            except PwTimeout:
-                logging.warning("Detay sayfası zaman aşımı.")
-                dates = []
-            except Exception as e:
-                logging.warning(f"Detay sayfası hata: {e}")
-                dates = []
-
-            msg = format_message(item, dates, cfg)
-            ok, err = send_message(msg)
-            if ok:
-                logging.info(f"[{idx}/{len(new_items)}] Telegram'a gönderildi.")
-                seen[item["id"]] = {
-                    "first_seen": datetime.now(timezone.utc).isoformat(),
-                    "url": item["url"],
-                    "price": item.get("price", 0),
-                }
-                state["seen_ids"] = seen
-                save_state(state)
-            else:
-                logging.error(f"Telegram gönderim hatası: {err}")
+                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                readiness.wait_for_network_idle(page, WAIT_SCROLL_MS, name="scroll_idle")
+            except Exception:
+                pass
 
-        context.close()
-        browser.close()
+        with stages.stage("collect_cards"):
+            listings = collect_cards(page)
+
+        def fetch_dates(item):
+            page.goto(item["url"], timeout=NAV_TIMEOUT, wait_until="domcontentloaded")
+            readiness.wait_for_date_items(page, WAIT_DOM_MS)
+            expand_content(page)
+            # Bazı sayfalar “devamını oku” tarzı gizleme kullanabilir
+            with stages.stage("collect_detail_dates"):
+                return collect_detail_dates(page)
+
+        if concurrency > 1:
+            new_items = select_new_items(listings, cfg, store, fanout)
+            if new_items:
+                process_details_concurrently(new_items, cfg, store, fanout, concurrency,
+                                             session.detail_pool())
+        else:
+            new_items = process_listings(listings, cfg, store, fanout, fetch_dates)
+    finally:
+        if own_session:
+            session.close()
+
+    if rfilter:
+        rfilter.log_summary(reset=True)
+
+    return new_items
+
+def run_scrape(session: BrowserSession = None):
+    """
+    Tek tarama çevrimi. session verilirse (daemon modu) Playwright yolu
+    o sıcak tarayıcıyı kullanır; verilmezse kendi tarayıcısını açıp kapatır.
+    """
+    cfg = load_config()
+    started = time.monotonic()
+    # Bekleme ve aşama sayaçları çevrim başında sıfırlanır; çevrim sonunda loglanır
+    # (bench/ gibi çağıranlar run_scrape döndükten sonra da okuyabilir)
+    readiness.stats.reset()
+    stages.stats.reset()
+    telegram.configure(cfg.get("telegram"))
+    store = state_store.open_store(cfg)
+    qcfg = cfg.get("notify_queue") or {}
+    box = outbox.open_outbox(cfg)
+    notifier = NotificationQueue(
+        send_message,
+        maxsize=int(qcfg.get("maxsize", 100)),
+        workers=int(qcfg.get("workers", 1)),
+        outbox=box,
+    )
+    try:
+        store.load()
+        # Gönderici thread kazımayla paralel çalışır; çıkışta kuyruk boşaltılır
+        with notifier:
+            # Her ilan bir kez kazınır, eşleşen tüm abonelere dağıtılır; özet modundaki
+            # sohbetlerde mesajlar 4096 karakterlik paketlerde birleştirilir
+            fanout = subscribers.Fanout(
+                notifier, subscribers.load_subscribers(cfg, telegram.CHAT_ID), cfg
+            )
+            try:
+                fanout.pending_ids = drain_outbox(fanout, store)
+                new_items = None
+                engine = (cfg.get("engine") or "playwright").strip().lower()
+                if engine == "http":
+                    new_items = run_scrape_http(cfg, store, fanout)
+                if new_items is None:
+                    new_items = run_scrape_playwright(cfg, store, fanout, session)
+            finally:
+                fanout.flush()
+        metrics.record_run(
+            stages.stats, readiness.stats, store=store, notifier=notifier, box=box,
+            duration_s=time.monotonic() - started,
+            peak_rss_mb=procinfo.peak_rss_mb(), tree_rss_mb=procinfo.tree_rss_mb(),
+        )
+    finally:
+        box.close()
+        store.close()
 
+    readiness.stats.log_summary()
+    stages.stats.log_summary()
+    metrics.write(cfg)
     if not new_items:
         logging.info("Yeni ilan yok veya selektörler eşleşmedi. İşlem tamam.")
+    return new_items
+
+
+# =========================
+#  DAEMON MODU
+# =========================
+DAEMON_STATUS_PATH = os.path.join("data", "daemon.json")
+
+def write_daemon_status(status: dict):
+    ensure_dirs()
+    tmp = DAEMON_STATUS_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(status, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, DAEMON_STATUS_PATH)
+
+def run_daemon(interval: float = 60, jitter: float = 10, recycle_cycles: int = 50,
+               max_rss_mb: float = 1500, max_cycles: int = 0):
+    """
+    Süreç içinde zamanlayıcı: her interval (+0..jitter) saniyede bir run_scrape çalıştırır.
+    Tarayıcı çevrimler arası açık kalır; recycle_cycles çevrim sonra veya süreç ağacının
+    RSS'i max_rss_mb'ı aşınca yeniden başlatılır. Çevrim süreleri data/daemon.json'a yazılır.
+    """
+    cfg = load_config()
+    session = BrowserSession(cfg)
+    stop = threading.Event()
+    # /metrics uç noktası (config.yaml: metrics.http_port, 0 = kapalı)
+    mcfg = cfg.get("metrics") or {}
+    metrics_server = None
+    if mcfg.get("enabled", True) and int(mcfg.get("http_port") or 0):
+        metrics_server = metrics.MetricsServer(int(mcfg["http_port"]), mcfg.get("http_host") or "127.0.0.1").start()
+
+    def on_signal(signum, frame):
+        logging.info(f"Sinyal alındı ({signum}), mevcut çevrimden sonra çıkılacak.")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, on_signal)
+    signal.signal(signal.SIGINT, on_signal)
+
+    cycle = 0
+    durations = []
+    try:
+        while not stop.is_set():
+            cycle += 1
+            started = time.monotonic()
+            started_at = datetime.now(timezone.utc).isoformat()
+            try:
+                # config değişiklikleri her çevrimde okunur (filtreler, engine vb.)
+                session.cfg = load_config()
+                run_scrape(session)
+                error = None
+            except Exception as e:
+                logging.exception(f"Çevrim {cycle} hata verdi")
+                error = str(e)
+                metrics.registry.inc("run_errors_total", 1, "Hata veren tarama çevrimi")
+                metrics.write(session.cfg)
+                # Tarayıcı bozulmuş olabilir; bir sonraki çevrimde temizden başla
+                session.close()
+            took = time.monotonic() - started
+            durations = (durations + [took])[-100:]
+
+            rss = procinfo.tree_rss_mb()
+            if session.started and (session.cycles >= recycle_cycles or (rss and rss > max_rss_mb)):
+                logging.info(f"Tarayıcı yenileniyor (çevrim={session.cycles}, rss={rss or 0:.0f} MB)")
+                session.close()
+
+            logging.info(f"Çevrim {cycle} tamam: {took:.1f} sn, rss={rss or 0:.0f} MB")
+            write_daemon_status({
+                "cycle": cycle,
+                "last_started_at": started_at,
+                "last_duration_s": round(took, 3),
+                "avg_duration_s": round(sum(durations) / len(durations), 3),
+                "max_duration_s": round(max(durations), 3),
+                "rss_mb": round(rss, 1) if rss else None,
+                "browser_cycles": session.cycles,
+                "last_error": error,
+            })
+
+            if max_cycles and cycle >= max_cycles:
+                break
+            # Bir sonraki çevrim: başlangıçtan interval (+ jitter) sonra
+            wait = max(0.0, interval + random.uniform(0, jitter) - took)
+            # Sinyal gelince bekleme hemen biter
+            stop.wait(wait)
+    finally:
+        session.close()
+        if metrics_server:
+            metrics_server.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="ucuzaucak.net → Telegram takip botu")
+    ap.add_argument("--daemon", action="store_true",
+                    help="sürekli çalış; tarayıcıyı çevrimler arası açık tut")
+    ap.add_argument("--interval", type=float, help="daemon çevrim aralığı (sn)")
+    ap.add_argument("--jitter", type=float, help="çevrim aralığına eklenecek rasgele üst sınır (sn)")
+    ap.add_argument("--recycle-cycles", type=int, help="tarayıcıyı bu kadar çevrimde bir yenile")
+    ap.add_argument("--max-rss-mb", type=float, help="süreç ağacı RSS bu değeri aşınca tarayıcıyı yenile")
+    ap.add_argument("--max-cycles", type=int, default=0, help="bu kadar çevrimden sonra çık (0 = sınırsız)")
+    ap.add_argument("--profile", choices=profiling.MODES,
+                    help="aşama başına profil: cprofile (.prof) ya da sample (flamegraph .folded)")
+    ap.add_argument("--profile-dir", default=profiling.PROFILE_DIR, help="profil çıktı kök dizini")
+    ap.add_argument("--profile-interval-ms", type=float, default=5, help="sample modunda örnekleme aralığı")
+    args = ap.parse_args(argv)
+
+    profiler = None
+    if args.profile:
+        profiler = profiling.Profiler(args.profile, args.profile_dir, args.profile_interval_ms).start()
+    try:
+        if not args.daemon:
+            run_scrape()
+            return
+
+        dcfg = load_config().get("daemon") or {}
+        run_daemon(
+            interval=args.interval if args.interval is not None else float(dcfg.get("interval", 60)),
+            jitter=args.jitter if args.jitter is not None else float(dcfg.get("jitter", 10)),
+            recycle_cycles=args.recycle_cycles or int(dcfg.get("recycle_cycles", 50)),
+            max_rss_mb=args.max_rss_mb or float(dcfg.get("max_rss_mb", 1500)),
+            max_cycles=args.max_cycles,
+        )
+    finally:
+        if profiler:
+            profiler.stop()
 
 
 if __name__ == "__main__":
-    run_scrape()
+    main()
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Çalıştırma aşamalarının süre ölçümü
+- with stages.stage("collect_cards"): ...  → aşama adı başına süre listesi (ms)
+- İç içe aşamalar desteklenir; her thread kendi aşama yığınını tutar (gönderici
+  thread'leri de yazabilir)
+- install_ipc_counter(): Playwright sync API'deki Page/Locator/ElementHandle
+  çağrılarını o an etkin olan aşamaya göre sayar (ölçüm/kıyaslama için; varsayılan kapalı)
+- listeners: aşama giriş/çıkışında stage_enter(name) / stage_exit(name) çağrılan nesneler
+  (profiling.py aşama başına profil bu kancalarla tutar)
+- reset_hooks: reset() öncesi biriken (durations, ipc) ile çağrılır; çevrimler arası
+  toplam tutmak isteyenler için (profiling.py --daemon --profile)
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+# Sayılan Playwright çağrıları (sync API sınıf adı -> metotlar)
+IPC_METHODS = {
+    "Page": ["goto", "evaluate", "content", "locator", "wait_for_selector", "wait_for_timeout",
+             "wait_for_load_state", "query_selector", "query_selector_all", "inner_text"],
+    "Locator": ["all", "count", "nth", "first", "inner_text", "text_content", "get_attribute",
+                "evaluate", "click", "is_visible", "locator"],
+    "ElementHandle": ["inner_text", "text_content", "get_attribute", "evaluate", "click"],
+}
+
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[min(len(s) - 1, int(round(pct / 100.0 * (len(s) - 1))))]
+
+
+class StageStats:
+    """Aşama adı -> süre (ms) listesi ve aşama başına Playwright çağrı sayaçları."""
+
+    def __init__(self):
+        self.durations = {}
+        self.ipc = {}
+        self.listeners = []
+        self.reset_hooks = []
+        self.stacks = {}    # thread ident -> aşama yığını (örnekleyici profilleyici okur)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+            with self._lock:
+                self.stacks[threading.get_ident()] = stack
+        return stack
+
+    @property
+    def current(self):
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def stage(self, name: str):
+        stack = self._stack()
+        stack.append(name)
+        for listener in self.listeners:
+            listener.stage_enter(name)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - t0) * 1000)
+            for listener in reversed(self.listeners):
+                listener.stage_exit(name)
+            stack.pop()
+
+    def record(self, name: str, ms: float):
+        with self._lock:
+            self.durations.setdefault(name, []).append(ms)
+
+    def count_ipc(self, method: str):
+        stage = self.current or "-"
+        with self._lock:
+            per_stage = self.ipc.setdefault(stage, {})
+            per_stage[method] = per_stage.get(method, 0) + 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            durations = {k: list(v) for k, v in self.durations.items()}
+            ipc = {k: dict(v) for k, v in self.ipc.items()}
+        out = {}
+        for name, values in durations.items():
+            out[name] = {
+                "count": len(values),
+                "total_ms": round(sum(values), 1),
+                "mean_ms": round(sum(values) / len(values), 2),
+                "p50_ms": round(_percentile(values, 50), 2),
+                "p95_ms": round(_percentile(values, 95), 2),
+                "max_ms": round(max(values), 2),
+            }
+        for name, calls in ipc.items():
+            out.setdefault(name, {"count": 0, "total_ms": 0.0})["ipc"] = {
+                "total": sum(calls.values()), "calls": dict(sorted(calls.items())),
+            }
+        return out
+
+    def log_summary(self):
+        summary = self.summary()
+        if not summary:
+            return
+        parts = [
+            f"{name}={s['total_ms']:.0f}ms/{s['count']}" + (f" ipc={s['ipc']['total']}" if "ipc" in s else "")
+            for name, s in summary.items()
+        ]
+        logging.info(f"Aşama süreleri: {' '.join(parts)}")
+
+    def reset(self):
+        alive = {t.ident for t in threading.enumerate()}
+        with self._lock:
+            durations, ipc = self.durations, self.ipc
+            self.durations = {}
+            self.ipc = {}
+            # Biten thread'lerin (ör. önceki çevrimin göndericileri) yığınları bırakılır
+            self.stacks = {k: v for k, v in self.stacks.items() if k in alive}
+        for hook in self.reset_hooks:
+            hook(durations, ipc)
+
+    def merge(self, durations: dict, ipc: dict):
+        """Başka bir ölçümün süre ve çağrı sayılarını bu nesneye ekler."""
+        with self._lock:
+            for name, values in durations.items():
+                self.durations.setdefault(name, []).extend(values)
+            for name, calls in ipc.items():
+                per_stage = self.ipc.setdefault(name, {})
+                for method, n in calls.items():
+                    per_stage[method] = per_stage.get(method, 0) + n
+
+
+stats = StageStats()
+stage = stats.stage
+
+_ipc_originals = []
+
+
+def install_ipc_counter(target: StageStats = None) -> bool:
+    """Playwright sync API metotlarını sayacı artıran sarmalayıcılarla değiştirir."""
+    if _ipc_originals:
+        return True
+    try:
+        from playwright.sync_api import Page, Locator, ElementHandle
+    except ImportError:
+        return False
+    target = target or stats
+    classes = {"Page": Page, "Locator": Locator, "ElementHandle": ElementHandle}
+    for cls_name, methods in IPC_METHODS.items():
+        cls = classes[cls_name]
+        for meth in methods:
+            orig = cls.__dict__.get(meth)
+            if orig is None:
+                continue
+            label = f"{cls_name}.{meth}"
+            if isinstance(orig, property):
+                def getter(self, _fget=orig.fget, _label=label):
+                    target.count_ipc(_label)
+                    return _fget(self)
+                setattr(cls, meth, property(getter))
+            else:
+                def wrapper(self, *a, _orig=orig, _label=label, **kw):
+                    target.count_ipc(_label)
+                    return _orig(self, *a, **kw)
+                setattr(cls, meth, wrapper)
+            _ipc_originals.append((cls, meth, orig))
+    return True
+
+
+def uninstall_ipc_counter():
+    while _ipc_originals:
+        cls, meth, orig = _ipc_originals.pop()
+        setattr(cls, meth, orig)
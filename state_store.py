@@ -0,0 +1,443 @@
+# -*- coding: utf-8 -*-
+"""
+Görülen ilan durumunun (seen_ids) saklanması
+- JsonStateStore   : data/state.json (eski biçim); her yazımda tüm dosya, atomik replace ile
+- SqliteStateStore : data/state.db (WAL); her gönderimde tek satır upsert + commit,
+                     ilk açılışta data/state.json'dan otomatik taşıma
+- JournalStateStore: data/state.json anlık görüntü + data/seen.jsonl ekleme günlüğü;
+                     her gönderim tek satır ekler, günlük büyüyünce sıkıştırılır
+Ortak arayüz:
+    store.load()                 -> {"seen_ids": {...}}  (saklama politikası uygulanmış)
+    store.seen                   -> seen_ids sözlüğü (bellekte)
+    store.mark_seen(id, entry)   -> tek kaydı kalıcı yazar
+    store.touch(ids)             -> ana sayfada hâlâ görünen kayıtların last_seen'ini tazeler
+    store.close()
+Saklama (RetentionPolicy): last_seen'e (yoksa first_seen) göre azami yaş + LRU azami kayıt sayısı;
+ana sayfada hâlâ duran ilanlar touch ile tazelendiğinden silinmez.
+"""
+
+import os
+import json
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timezone, timedelta
+
+import stages
+
+DATA_DIR = "data"
+JSON_PATH = os.path.join(DATA_DIR, "state.json")
+SQLITE_PATH = os.path.join(DATA_DIR, "state.db")
+JOURNAL_PATH = os.path.join(DATA_DIR, "seen.jsonl")
+JOURNAL_MAX_BYTES = 256 * 1024
+# touch: last_seen en fazla bu sıklıkla güncellenir (her çalıştırmada yazım olmasın)
+TOUCH_INTERVAL = timedelta(hours=6)
+
+
+def _ensure_parent(path: str):
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+
+
+def _fsync_dir(path: str):
+    """Dosyayı içeren dizini fsync'ler (rename'in kalıcı olması için); desteklenmiyorsa geçer."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def read_json_state(path: str = JSON_PATH):
+    """state.json'u okur; yoksa boş durum, bozuksa None döner."""
+    if not os.path.exists(path):
+        return {"seen_ids": {}}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        data.setdefault("seen_ids", {})
+        return data
+    except Exception as e:
+        logging.error(f"Durum dosyası okunamadı ({path}): {e}")
+        return None
+
+
+def _parse_ts(value):
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+class RetentionPolicy:
+    """
+    max_age_days: bu kadar gündür görülmeyen (last_seen, yoksa first_seen) kayıtlar silinir (0 = sınırsız)
+    max_entries : kayıt sayısı bunu aşarsa en uzun süredir görülmeyenler (last_seen) silinir (0 = sınırsız)
+    """
+
+    def __init__(self, max_age_days: float = 0, max_entries: int = 0):
+        self.max_age_days = max_age_days
+        self.max_entries = max_entries
+
+    @classmethod
+    def from_config(cls, cfg: dict):
+        r = cfg.get("retention") or {}
+        policy = cls(float(r.get("max_age_days") or 0), int(r.get("max_entries") or 0))
+        return policy if (policy.max_age_days or policy.max_entries) else None
+
+    def select_evictions(self, seen: dict, now: datetime = None) -> dict:
+        """Silinecek kayıtları {id: sebep} olarak döner ('age' | 'lru')."""
+        now = now or datetime.now(timezone.utc)
+        evict = {}
+
+        def last_seen(id_):
+            e = seen[id_] or {}
+            return _parse_ts(e.get("last_seen")) or _parse_ts(e.get("first_seen"))
+
+        if self.max_age_days:
+            # Yaş son görülmeden ölçülür: hâlâ yayında olan eski ilan yeniden "yeni" sayılmasın
+            cutoff = now - timedelta(days=self.max_age_days)
+            for id_ in seen:
+                last = last_seen(id_)
+                if last and last < cutoff:
+                    evict[id_] = "age"
+        if self.max_entries:
+            remaining = [id_ for id_ in seen if id_ not in evict]
+            extra = len(remaining) - self.max_entries
+            if extra > 0:
+                oldest = datetime.min.replace(tzinfo=timezone.utc)
+                for id_ in sorted(remaining, key=lambda i: last_seen(i) or oldest)[:extra]:
+                    evict[id_] = "lru"
+        return evict
+
+
+class BaseStateStore:
+    """Backend'lerin ortak kısmı; alt sınıflar _write_entries / _delete_entries yazar."""
+
+    def __init__(self):
+        self.state = {"seen_ids": {}}
+        self.retention = None
+        self.last_evicted = {}
+        self._lock = threading.RLock()
+
+    @property
+    def seen(self) -> dict:
+        return self.state.setdefault("seen_ids", {})
+
+    def _write_entries(self, ids):
+        raise NotImplementedError
+
+    def files(self) -> list:
+        """Backend'in diskteki dosyaları (metrikler için boyut ölçümü)."""
+        return []
+
+    def disk_bytes(self) -> int:
+        return sum(os.path.getsize(p) for p in self.files() if os.path.exists(p))
+
+    def _delete_entries(self, ids):
+        raise NotImplementedError
+
+    def mark_seen(self, item_id: str, entry: dict):
+        entry.setdefault("last_seen", entry.get("first_seen"))
+        with self._lock, stages.stage("save_state"):
+            self.seen[item_id] = entry
+            self._write_entries([item_id])
+
+    def touch(self, ids, now: datetime = None):
+        """Hâlâ yayında olan kayıtların last_seen'ini (TOUCH_INTERVAL'dan eskiyse) tazeler."""
+        now = now or datetime.now(timezone.utc)
+        changed = []
+        with self._lock:
+            for id_ in ids:
+                entry = self.seen.get(id_)
+                if entry is None:
+                    continue
+                last = _parse_ts(entry.get("last_seen"))
+                if last is None or now - last >= TOUCH_INTERVAL:
+                    entry["last_seen"] = now.isoformat()
+                    changed.append(id_)
+            if changed:
+                with stages.stage("save_state"):
+                    self._write_entries(changed)
+        return changed
+
+    def apply_retention(self, now: datetime = None) -> dict:
+        """Politikaya göre kayıtları siler, raporlar ve {id: sebep} döner."""
+        self.last_evicted = {}
+        if not self.retention:
+            return self.last_evicted
+        with self._lock:
+            evict = self.retention.select_evictions(self.seen, now)
+            if not evict:
+                return self.last_evicted
+            report = [(id_, reason, (self.seen.get(id_) or {}).get("first_seen")) for id_, reason in evict.items()]
+            for id_ in evict:
+                self.seen.pop(id_, None)
+            self._delete_entries(list(evict))
+        self.last_evicted = evict
+        by_reason = {}
+        for reason in evict.values():
+            by_reason[reason] = by_reason.get(reason, 0) + 1
+        logging.info(
+            f"Saklama politikası: {len(evict)} kayıt silindi "
+            f"({', '.join(f'{k}={v}' for k, v in sorted(by_reason.items()))}), kalan {len(self.seen)}"
+        )
+        for id_, reason, first_seen in report:
+            logging.debug(f"Silindi [{reason}] {id_} (first_seen={first_seen})")
+        return evict
+
+
+class JsonStateStore(BaseStateStore):
+    def __init__(self, path: str = JSON_PATH):
+        super().__init__()
+        self.path = path
+
+    def files(self) -> list:
+        return [self.path]
+
+    def load(self) -> dict:
+        _ensure_parent(self.path)
+        data = read_json_state(self.path)
+        if data is None:
+            # Boş durumla devam etmek tüm ilanları yeniden bildirir; diğer arka uçlar gibi dur
+            raise RuntimeError(f"{self.path} bozuk; durum yüklenemedi.")
+        self.state = data
+        self.apply_retention()
+        return self.state
+
+    def save(self):
+        """
+        Tüm durumu geçici dosyaya yazıp atomik olarak yer değiştirir. Dosya ve dizin
+        fsync'lenir: güç kesintisinden sonra ya eski ya yeni anlık görüntü kalır
+        (JournalStateStore.compact günlüğü ancak bundan sonra boşaltır).
+        """
+        _ensure_parent(self.path)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        _fsync_dir(self.path)
+
+    def _write_entries(self, ids):
+        self.save()
+
+    def _delete_entries(self, ids):
+        self.save()
+
+    def close(self):
+        pass
+
+
+class SqliteStateStore(BaseStateStore):
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS seen (
+        id          TEXT PRIMARY KEY,
+        first_seen  TEXT,
+        url         TEXT,
+        price       INTEGER,
+        extra       TEXT
+    );
+    CREATE TABLE IF NOT EXISTS meta (
+        key   TEXT PRIMARY KEY,
+        value TEXT
+    );
+    """
+
+    def __init__(self, path: str = SQLITE_PATH, json_path: str = JSON_PATH):
+        super().__init__()
+        self.path = path
+        self.json_path = json_path
+        _ensure_parent(path)
+        # detail_pool sonuçları ayrı thread'de yazabildiğinden check_same_thread=False + kilit
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.conn.commit()
+
+    def files(self) -> list:
+        return [self.path, self.path + "-wal"]
+
+    @staticmethod
+    def _split(entry: dict):
+        extra = {k: v for k, v in entry.items() if k not in ("first_seen", "url", "price")}
+        return (
+            entry.get("first_seen"),
+            entry.get("url"),
+            int(entry.get("price") or 0),
+            json.dumps(extra, ensure_ascii=False) if extra else None,
+        )
+
+    def _upsert_many(self, rows):
+        self.conn.executemany(
+            "INSERT INTO seen (id, first_seen, url, price, extra) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET first_seen=excluded.first_seen, url=excluded.url, "
+            "price=excluded.price, extra=excluded.extra",
+            rows,
+        )
+
+    def migrate_from_json(self) -> int:
+        """
+        Tablo boşsa ve henüz taşınmadıysa state.json içeriğini tek işlemde aktarır.
+        Aktarılan kayıt sayısını döner.
+        """
+        done = self.conn.execute("SELECT value FROM meta WHERE key='migrated_json'").fetchone()
+        count = self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+        if done or count or not os.path.exists(self.json_path):
+            return 0
+        data = read_json_state(self.json_path)
+        if data is None:
+            # Bozuk JSON: boşla başlayıp bildirim fırtınası yaratmaktansa dur
+            raise RuntimeError(f"{self.json_path} bozuk; taşıma yapılamadı.")
+        seen = data.get("seen_ids") or {}
+        with self.conn:
+            self._upsert_many((k, *self._split(v or {})) for k, v in seen.items())
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_json', ?)",
+                              (str(len(seen)),))
+        logging.info(f"state.json → SQLite taşındı: {len(seen)} kayıt")
+        return len(seen)
+
+    def load(self) -> dict:
+        with self._lock:
+            self.migrate_from_json()
+            seen = {}
+            for id_, first_seen, url, price, extra in self.conn.execute(
+                "SELECT id, first_seen, url, price, extra FROM seen"
+            ):
+                entry = {"first_seen": first_seen, "url": url, "price": price}
+                if extra:
+                    entry.update(json.loads(extra))
+                seen[id_] = entry
+            self.state = {"seen_ids": seen}
+            self.apply_retention()
+            return self.state
+
+    def _write_entries(self, ids):
+        with self.conn:
+            self._upsert_many([(id_, *self._split(self.seen[id_])) for id_ in ids])
+
+    def _delete_entries(self, ids):
+        with self.conn:
+            self.conn.executemany("DELETE FROM seen WHERE id = ?", [(id_,) for id_ in ids])
+
+    def close(self):
+        with self._lock:
+            try:
+                self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error:
+                pass
+            self.conn.close()
+
+
+class JournalStateStore(JsonStateStore):
+    """
+    Anlık görüntü (state.json) + ekleme günlüğü (seen.jsonl).
+    mark_seen yalnızca günlüğe bir satır ekler (O(1), fsync'li); günlük
+    max_bytes'ı aşınca anlık görüntü yeniden yazılır ve günlük boşaltılır.
+    Yarım kalmış son satır (çökme) okunurken atlanır.
+    """
+
+    def __init__(self, path: str = JSON_PATH, journal_path: str = JOURNAL_PATH,
+                 max_bytes: int = JOURNAL_MAX_BYTES):
+        super().__init__(path)
+        self.journal_path = journal_path
+        self.max_bytes = max_bytes
+
+    def files(self) -> list:
+        return [self.path, self.journal_path]
+
+    def _replay(self) -> int:
+        if not os.path.exists(self.journal_path):
+            return 0
+        applied = 0
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                    self.seen[rec["id"]] = rec.get("entry") or {}
+                    applied += 1
+                except (ValueError, KeyError, TypeError):
+                    logging.warning("Günlükte okunamayan satır atlandı.")
+        return applied
+
+    def _terminate_partial_line(self):
+        """Çökmeden kalan yarım satır varsa yeni kayıt ona yapışmasın diye satırı kapatır."""
+        if self._journal_size() == 0:
+            return
+        with open(self.journal_path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+
+    def _journal_size(self) -> int:
+        try:
+            return os.path.getsize(self.journal_path)
+        except OSError:
+            return 0
+
+    def load(self) -> dict:
+        _ensure_parent(self.path)
+        data = read_json_state(self.path)
+        if data is None:
+            raise RuntimeError(f"{self.path} bozuk; günlük uygulanamadı.")
+        self.state = data
+        self._replay()
+        self._terminate_partial_line()
+        # Açılış süresi sınırlı kalsın: büyümüş günlüğü hemen sıkıştır
+        if self._journal_size() > self.max_bytes:
+            self.compact()
+        self.apply_retention()
+        return self.state
+
+    def compact(self):
+        """Bellekteki durumu anlık görüntüye yazar, ardından günlüğü boşaltır."""
+        # save() anlık görüntüyü diske kalıcı yazmadan dönmez; günlük ancak sonra kesilir
+        self.save()
+        with open(self.journal_path, "w", encoding="utf-8") as f:
+            f.flush()
+            os.fsync(f.fileno())
+        logging.info(f"Günlük sıkıştırıldı: {len(self.seen)} kayıt anlık görüntüde.")
+
+    def _write_entries(self, ids):
+        lines = "".join(
+            json.dumps({"id": id_, "entry": self.seen[id_]}, ensure_ascii=False) + "\n" for id_ in ids
+        )
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        if self._journal_size() > self.max_bytes:
+            self.compact()
+
+    def _delete_entries(self, ids):
+        # Günlükte silme kaydı yok; anlık görüntüyü yeniden yaz
+        self.compact()
+
+
+def open_store(cfg: dict):
+    """
+    config.yaml'daki state_backend'e göre (json | sqlite | journal) store döner.
+    retention bloğu varsa load() sırasında uygulanır.
+    """
+    backend = (cfg.get("state_backend") or "json").strip().lower()
+    if backend == "sqlite":
+        store = SqliteStateStore()
+    elif backend == "journal":
+        store = JournalStateStore(max_bytes=int(cfg.get("journal_max_bytes") or JOURNAL_MAX_BYTES))
+    else:
+        if backend != "json":
+            logging.warning(f"Bilinmeyen state_backend '{backend}', json kullanılıyor.")
+        store = JsonStateStore()
+    store.retention = RetentionPolicy.from_config(cfg)
+    return store
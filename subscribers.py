@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Çok aboneli dağıtım
+- config.yaml'daki subscribers listesi: her abonenin kendi chat_id'si, filtreleri ve özet ayarı
+- subscribers yoksa tek "default" abone: TELEGRAM_CHAT_ID + üst düzey filters bloğu
+- Fanout: bir ilanın mesajını eşleşen her abonenin sohbetine (gerekirse o sohbete ait
+  özet tamponu üzerinden) gönderim kuyruğuna koyar; gönderimler kuyruğun işçi
+  thread'lerinde eşzamanlı yürür
+"""
+
+import digest
+
+DEFAULT_NAME = "default"
+
+
+class Subscriber:
+    def __init__(self, name: str, chat_id: str, filters: dict = None, digest_cfg: dict = None):
+        self.name = name
+        self.chat_id = str(chat_id or "")
+        self.filters = filters or {}
+        self.digest_cfg = digest_cfg or {}
+
+    def outbox_key(self, item_id: str) -> str:
+        # Tek aboneli eski kurulumda outbox anahtarı ilan id'si olarak kalır
+        return item_id if self.name == DEFAULT_NAME else f"{self.name}|{item_id}"
+
+    def __repr__(self):
+        return f"Subscriber({self.name!r}, chat_id={self.chat_id!r})"
+
+
+def load_subscribers(cfg: dict, default_chat_id: str = "") -> list:
+    subs = []
+    for i, s in enumerate(cfg.get("subscribers") or []):
+        subs.append(Subscriber(
+            name=str(s.get("name") or f"abone{i + 1}"),
+            chat_id=s.get("chat_id") or "",
+            filters=s.get("filters") or {},
+            digest_cfg=s.get("digest") or {},
+        ))
+    if not subs:
+        subs.append(Subscriber(DEFAULT_NAME, default_chat_id, cfg.get("filters") or {}))
+    return subs
+
+
+class Fanout:
+    """Abone başına gönderim: notifier (NotificationQueue) + sohbet başına DigestBuffer."""
+
+    def __init__(self, notifier, subscribers: list, cfg: dict):
+        self.notifier = notifier
+        self.subscribers = {s.name: s for s in subscribers}
+        self.pending_ids = set()   # outbox'ta bekleyen ilanlar (drain_outbox doldurur)
+        self.sinks = {}
+        for s in subscribers:
+            dcfg = digest.digest_settings(cfg, s.chat_id)
+            dcfg.update(s.digest_cfg)
+            if dcfg.get("enabled"):
+                self.sinks[s.name] = digest.DigestBuffer(
+                    notifier, min(int(dcfg.get("max_chars") or digest.TELEGRAM_MAX_CHARS),
+                                  digest.TELEGRAM_MAX_CHARS),
+                    chat_id=s.chat_id,
+                )
+
+    @property
+    def outbox(self):
+        return self.notifier.outbox
+
+    def submit(self, sub_name: str, item_id: str, text: str, record: dict,
+               on_ack=None, on_fail=None, label: str = ""):
+        s = self.subscribers[sub_name]
+        meta = {"item_id": item_id, "subscriber": s.name, "chat_id": s.chat_id, "record": record}
+        sink = self.sinks.get(sub_name) or self.notifier
+        sink.submit(text, on_ack=on_ack, on_fail=on_fail, label=label,
+                    key=s.outbox_key(item_id), meta=meta, chat_id=s.chat_id)
+
+    def flush(self):
+        for sink in self.sinks.values():
+            sink.flush()
@@ -2,7 +2,13 @@
 """
 Telegram yardımcıları
 - BOT_TOKEN ve CHAT_ID ortam değişkenlerinden okunur
-- Basit POST ile mesaj gönderir (sendMessage)
+- API adresi: config.yaml telegram.api_base > TELEGRAM_API_BASE ortam değişkeni > api.telegram.org
+  (yerel sahte sunucu için bkz. fake_telegram.py)
+- TelegramClient: keep-alive bağlantı havuzlu requests.Session + sohbet başına
+  ve genel token-bucket hız sınırlayıcı ile sendMessage
+- RetryPolicy: 429'da parameters.retry_after kadar bekleyip yeniden dener,
+  5xx/ağ hatalarında jitter'lı üstel geri çekilme uygular
+- send_message: varsayılan istemciyi kullanan modül düzeyi kısayol
 """
 
 import os
@@ -10,41 +16,232 @@ import json
 import time
 import random
 import logging
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 
-TELEGRAM_API_BASE = "https://api.telegram.org"
+TELEGRAM_API_BASE = os.getenv("TELEGRAM_API_BASE") or "https://api.telegram.org"
 
 BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
 
-def send_message(text: str, parse_mode: str = None):
+# Telegram sınırları: sohbet başına ~1 mesaj/sn, gruplarda 20 mesaj/dk, bot geneli ~30 mesaj/sn
+PER_CHAT_RATE = 1.0
+GROUP_CHAT_RATE = 20 / 60
+GLOBAL_RATE = 30.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket: saniyede rate jeton, en fazla capacity birikir."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Bir jeton ayırır; jeton için beklenmesi gereken süreyi döner."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
+class RetryPolicy:
     """
-    Telegram'a mesaj gönderir.
-    Dönüş: (ok: bool, error: str|None)
+    max_attempts   : toplam deneme sayısı (1 = yeniden deneme yok)
+    base_delay     : üstel geri çekilmenin ilk adımı (sn); n. denemede base*2^n'e kadar rasgele
+    max_delay      : tek beklemenin üst sınırı (sn)
+    max_retry_after: Telegram bundan uzun beklemeyi isterse beklemeden vazgeç (mesaj outbox'a gider)
     """
-    if not BOT_TOKEN or not CHAT_ID:
-        return False, "TELEGRAM_BOT_TOKEN veya TELEGRAM_CHAT_ID tanımlı değil."
 
-    url = f"{TELEGRAM_API_BASE}/bot{BOT_TOKEN}/sendMessage"
-    payload = {
-        "chat_id": CHAT_ID,
-        "text": text,
-        "disable_web_page_preview": True,
-    }
-    if parse_mode:
-        payload["parse_mode"] = parse_mode
+    def __init__(self, max_attempts: int = 5, base_delay: float = 1.0, max_delay: float = 30.0,
+                 max_retry_after: float = 60.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    def backoff(self, attempt: int) -> float:
+        """attempt (0'dan) için 'full jitter' üstel bekleme süresi."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
 
-    # Küçük bir rasgele gecikme (rate-limit ve bot davranışı açısından nazik olmak için)
-    time.sleep(random.uniform(0.2, 0.6))
 
+def _retry_after(resp) -> float:
+    """429 gövdesindeki parameters.retry_after (yoksa Retry-After başlığı)."""
     try:
-        resp = requests.post(url, json=payload, timeout=20)
+        ra = (resp.json().get("parameters") or {}).get("retry_after")
+        if ra is not None:
+            return float(ra)
+    except ValueError:
+        pass
+    try:
+        return float(resp.headers.get("Retry-After") or 1)
+    except ValueError:
+        return 1.0
+
+
+class TelegramClient:
+    def __init__(self, token: str = None, chat_id: str = None, api_base: str = TELEGRAM_API_BASE,
+                 connect_timeout: float = 5, read_timeout: float = 20, pool_size: int = 4,
+                 per_chat_rate: float = PER_CHAT_RATE, group_chat_rate: float = GROUP_CHAT_RATE,
+                 global_rate: float = GLOBAL_RATE, retry: RetryPolicy = None):
+        self.retry = retry or RetryPolicy()
+        self.token = BOT_TOKEN if token is None else token
+        self.chat_id = CHAT_ID if chat_id is None else chat_id
+        self.api_base = api_base.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.per_chat_rate = per_chat_rate
+        self.group_chat_rate = group_chat_rate
+        self.global_bucket = TokenBucket(global_rate, capacity=global_rate)
+        self._chat_buckets = {}
+        self._buckets_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @classmethod
+    def from_config(cls, tcfg: dict):
+        """config.yaml'daki telegram bloğundan istemci oluşturur."""
+        tcfg = tcfg or {}
+        rcfg = tcfg.get("retry") or {}
+        return cls(
+            api_base=tcfg.get("api_base") or TELEGRAM_API_BASE,
+            retry=RetryPolicy(
+                max_attempts=int(rcfg.get("max_attempts", 5)),
+                base_delay=float(rcfg.get("base_delay", 1.0)),
+                max_delay=float(rcfg.get("max_delay", 30.0)),
+                max_retry_after=float(rcfg.get("max_retry_after", 60.0)),
+            ),
+            connect_timeout=float(tcfg.get("connect_timeout", 5)),
+            read_timeout=float(tcfg.get("read_timeout", 20)),
+            pool_size=int(tcfg.get("pool_size", 4)),
+            per_chat_rate=float(tcfg.get("per_chat_rate", PER_CHAT_RATE)),
+            group_chat_rate=float(tcfg.get("group_chat_rate", GROUP_CHAT_RATE)),
+            global_rate=float(tcfg.get("global_rate", GLOBAL_RATE)),
+        )
+
+    def _chat_bucket(self, chat_id: str) -> TokenBucket:
+        with self._buckets_lock:
+            b = self._chat_buckets.get(chat_id)
+            if b is None:
+                # Negatif chat_id = grup/kanal → daha sıkı sınır
+                rate = self.group_chat_rate if str(chat_id).startswith("-") else self.per_chat_rate
+                b = self._chat_buckets[chat_id] = TokenBucket(rate)
+            return b
+
+    def send_message(self, text: str, parse_mode: str = None, chat_id: str = None):
+        """
+        Telegram'a mesaj gönderir.
+        Dönüş: (ok: bool, error: str|None)
+        """
+        chat_id = chat_id or self.chat_id
+        if not self.token or not chat_id:
+            return False, "TELEGRAM_BOT_TOKEN veya TELEGRAM_CHAT_ID tanımlı değil."
+
+        url = f"{self.api_base}/bot{self.token}/sendMessage"
+        payload = {
+            "chat_id": chat_id,
+            "text": text,
+            "disable_web_page_preview": True,
+        }
+        if parse_mode:
+            payload["parse_mode"] = parse_mode
+
+        err = None
+        for attempt in range(self.retry.max_attempts):
+            ok, err, wait = self._post_once(url, payload, attempt)
+            if ok:
+                return True, None
+            if wait is None or attempt + 1 >= self.retry.max_attempts:
+                break
+            logging.info(f"Telegram yeniden denenecek ({attempt + 1}/{self.retry.max_attempts}) "
+                         f"{wait:.1f} sn sonra: {err}")
+            time.sleep(wait)
+        return False, err
+
+    def _post_once(self, url: str, payload: dict, attempt: int):
+        """
+        Tek sendMessage denemesi. Dönüş: (ok, error, wait)
+        wait None ise hata kalıcıdır (yeniden denenmez), aksi halde beklenecek saniye.
+        """
+        # Kör bekleme yerine Telegram sınırlarına göre jeton bekle
+        self._chat_bucket(payload["chat_id"]).acquire()
+        self.global_bucket.acquire()
+
+        try:
+            resp = self.session.post(url, json=payload, timeout=self.timeout)
+        except requests.RequestException as e:
+            return False, str(e), self.retry.backoff(attempt)
+
+        if resp.status_code == 429:
+            ra = _retry_after(resp)
+            logging.warning(f"Telegram 429, retry_after={ra}")
+            if ra > self.retry.max_retry_after:
+                return False, f"HTTP 429 (retry_after={ra:.0f})", None
+            return False, "HTTP 429", ra
+        if resp.status_code >= 500:
+            logging.warning(f"Telegram status={resp.status_code} body={resp.text[:200]}")
+            return False, f"HTTP {resp.status_code}", self.retry.backoff(attempt)
         if resp.status_code != 200:
             logging.warning(f"Telegram status={resp.status_code} body={resp.text[:200]}")
-            return False, f"HTTP {resp.status_code}"
-        data = resp.json()
+            return False, f"HTTP {resp.status_code}", None
+        try:
+            data = resp.json()
+        except ValueError:
+            return False, "Geçersiz JSON yanıtı", self.retry.backoff(attempt)
         if not data.get("ok"):
-            return False, json.dumps(data)
-        return True, None
-    except requests.RequestException as e:
-        return False, str(e)
+            return False, json.dumps(data), None
+        return True, None, None
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_cfg = None
+_default_lock = threading.Lock()
+
+
+def configure(tcfg: dict = None) -> TelegramClient:
+    """
+    Varsayılan istemciyi config.yaml'daki telegram bloğuyla kurar.
+    Ayar değişmediyse mevcut istemci (ve sıcak bağlantıları) korunur.
+    """
+    global _default_client, _default_cfg
+    tcfg = dict(tcfg or {})
+    with _default_lock:
+        if _default_client is not None and tcfg == _default_cfg:
+            return _default_client
+        if _default_client is not None:
+            _default_client.close()
+        _default_client = TelegramClient.from_config(tcfg)
+        _default_cfg = tcfg
+        return _default_client
+
+
+def get_client() -> TelegramClient:
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = TelegramClient()
+        return _default_client
+
+
+def send_message(text: str, parse_mode: str = None, chat_id: str = None):
+    """
+    Telegram'a mesaj gönderir (varsayılan istemci; chat_id verilmezse TELEGRAM_CHAT_ID).
+    Dönüş: (ok: bool, error: str|None)
+    """
+    return get_client().send_message(text, parse_mode, chat_id=chat_id)
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+
+# Modüller depo kökünde düz dosyalar; paket kurulumu yok
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import dedup
+
+RULES = dedup.RenotifyRules(price_drop_pct=10, new_dates=True)
+
+
+def _item(price):
+    return {"url": "https://x/ilan/1", "price": price}
+
+
+def _step(entry, price, rules=RULES):
+    """Bir çevrimi taklit eder: sınıfla, fiyat artışında ya da bildirimde kaydı güncelle."""
+    change = dedup.classify(_item(price), entry, rules)
+    if change == dedup.PRICE_UP:
+        entry = dedup.refresh_price(entry, _item(price))
+    elif change in (dedup.NEW, dedup.PRICE_DROP):
+        entry = dict(entry or {}, **dedup.entry_fields(_item(price), []))
+    elif change == dedup.RECHECK:
+        # Yeni tarih yok: sessiz güncelleme, bildirilen fiyat değişmez
+        entry = dict(entry, **dedup.entry_fields(_item(price), [], notified=False),
+                     notified_price=dedup.notified_price(entry))
+    return change, entry
+
+
+def test_transitions_measured_against_notified_price():
+    entry = None
+    changes = []
+    for price in (10000, 12000, 10000, 9500, 8900):
+        change, entry = _step(entry, price)
+        changes.append(change)
+    assert changes == [dedup.NEW, dedup.PRICE_UP, dedup.PRICE_UP, dedup.RECHECK, dedup.PRICE_DROP]
+    assert entry["notified_price"] == 8900
+
+
+def test_recheck_does_not_move_notified_price():
+    entry = dedup.entry_fields(_item(10000), [])
+    _, entry = _step(entry, 9500)
+    assert entry["price"] == 9500 and entry["notified_price"] == 10000
+    # Son görülenden küçük düşüşler birikerek eşiği geçince bildirilir
+    change, _ = _step(entry, 8950)
+    assert change == dedup.PRICE_DROP
+
+
+def test_unchanged_or_unknown_price_is_skipped():
+    entry = dedup.entry_fields(_item(10000), [])
+    assert dedup.classify(_item(10000), entry, RULES) is None
+    assert dedup.classify(_item(0), entry, RULES) is None
+    assert dedup.classify(_item(5000), {"url": "u"}, RULES) is None
+
+
+def test_rules_disabled_only_new():
+    rules = dedup.RenotifyRules()
+    assert dedup.classify(_item(1), None, rules) == dedup.NEW
+    assert dedup.classify(_item(1), dedup.entry_fields(_item(10000), []), rules) is None
+
+
+def test_drop_without_new_dates_rule():
+    rules = dedup.RenotifyRules(price_drop_pct=10)
+    entry = dedup.entry_fields(_item(10000), [])
+    assert dedup.classify(_item(9500), entry, rules) is None
+    assert dedup.classify(_item(9000), entry, rules) == dedup.PRICE_DROP
+
+
+def test_refresh_price_keeps_notified_and_dates():
+    entry = {"price": 10000, "date_keys": ["k"], "first_seen": "t"}
+    record = dedup.refresh_price(entry, _item(12000))
+    assert record == {"price": 12000, "notified_price": 10000, "date_keys": ["k"], "first_seen": "t"}
+    assert entry["price"] == 10000
+
+
+def test_added_dates():
+    entry = dedup.entry_fields(_item(1), ["1 Mart - 8 Mart"])
+    assert dedup.added_dates(entry, ["1 Mart - 8 Mart", "5 Nisan - 12 Nisan"]) == ["5 Nisan - 12 Nisan"]
+    assert dedup.added_dates(None, ["a"]) == ["a"]
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import digest
+from digest import TELEGRAM_MAX_CHARS, SEPARATOR
+
+
+class Notifier:
+    outbox = None
+
+    def __init__(self):
+        self.batches = []
+
+    def submit_batch(self, texts, parts, label="", chat_id=None):
+        self.batches.append((texts, [p[0] for p in parts], chat_id))
+
+
+def _listing(i, size=900):
+    head = f"✈️ İlan {i}\n"
+    return head + "x" * (size - len(head))
+
+
+def test_packs_listings_under_limit():
+    notifier = Notifier()
+    buf = digest.DigestBuffer(notifier, chat_id="c1")
+    listings = [_listing(i) for i in range(10)]
+    for text in listings:
+        buf.submit(text)
+    buf.flush()
+
+    sent = [texts for texts, _, _ in notifier.batches]
+    assert all(len(texts) == 1 and len(texts[0]) <= TELEGRAM_MAX_CHARS for texts in sent)
+    # 4 × 900 + 3 ayraç sığar, 5. ilan sığmaz
+    assert [len(parts) for _, parts, _ in notifier.batches] == [4, 4, 2]
+    # İlanlar bölünmez; sıra ve içerik korunur
+    assert SEPARATOR.join(t[0] for t in sent).split(SEPARATOR) == listings
+    assert {chat for _, _, chat in notifier.batches} == {"c1"}
+
+
+def test_exact_limit_fits_in_one_message():
+    notifier = Notifier()
+    buf = digest.DigestBuffer(notifier, max_chars=100, separator="|")
+    buf.submit("a" * 49)
+    buf.submit("b" * 50)    # 49 + 1 + 50 = 100
+    buf.submit("c")
+    buf.flush()
+    assert [texts for texts, _, _ in notifier.batches] == [["a" * 49 + "|" + "b" * 50], ["c"]]
+
+
+def test_single_oversized_listing_is_split_on_lines():
+    notifier = Notifier()
+    buf = digest.DigestBuffer(notifier)
+    text = "\n".join(f"📅 {i}. tarih aralığı " + "-" * 60 for i in range(200))
+    buf.submit(text)
+    buf.flush()
+    (texts, parts, _), = notifier.batches
+    assert len(texts) > 1 and parts == [text]
+    assert all(len(t) <= TELEGRAM_MAX_CHARS for t in texts)
+    assert "\n".join(texts) == text
+
+
+def test_split_long_hard_splits_overlong_line():
+    line = "y" * (TELEGRAM_MAX_CHARS * 2 + 10)
+    parts = digest.split_long("başlık\n" + line, TELEGRAM_MAX_CHARS)
+    assert parts[0] == "başlık"
+    assert "".join(parts[1:]) == line
+    assert all(len(p) <= TELEGRAM_MAX_CHARS for p in parts)
+    assert digest.split_long("kısa") == ["kısa"]
+
+
+def test_digest_settings_per_chat_and_clamp():
+    cfg = {"digest": {"enabled": True, "max_chars": 10000, "chats": {"42": {"max_chars": 2000}}}}
+    assert digest.digest_settings(cfg)["max_chars"] == TELEGRAM_MAX_CHARS
+    per_chat = digest.digest_settings(cfg, chat_id=42)
+    assert per_chat["max_chars"] == 2000 and per_chat["enabled"] is True
+    assert digest.digest_settings({})["enabled"] is False
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from filter_index import AhoCorasick, FilterIndex
+from subscribers import Subscriber
+from textnorm import normalize_tr
+
+CITIES = ["İstanbul", "Ankara", "İzmir", "Tokyo", "Şanghay", "Roma", "Paris", "Ağrı", "Muğla", "New York"]
+FRAGMENTS = ["", "ist", "İSTANBUL", "anka", "izm", "tok", "sanghay", "ROMA", "par", "york", "ı", "a"]
+
+
+def _matches(filters: dict, item: dict) -> bool:
+    """apply_filters'ın tek abone için koşulu (karşılaştırma referansı)."""
+    dep = normalize_tr(filters.get("departure") or "")
+    arrivals = [normalize_tr(a) for a in (filters.get("arrivals") or [])]
+    max_price = int(filters.get("max_price") or 0)
+    if dep and dep not in normalize_tr(item.get("origin", "")):
+        return False
+    if arrivals and all(a not in normalize_tr(item.get("destination", "")) for a in arrivals):
+        return False
+    return not (max_price and (item.get("price") or 0) > max_price)
+
+
+def _random_subs(rng, n):
+    subs = []
+    for i in range(n):
+        filters = {}
+        if rng.random() < 0.7:
+            filters["departure"] = rng.choice(FRAGMENTS)
+        if rng.random() < 0.7:
+            filters["arrivals"] = rng.sample(FRAGMENTS, rng.randint(0, 3))
+        if rng.random() < 0.6:
+            filters["max_price"] = rng.choice([0, 5000, 15000, 30000])
+        # Aynı adı paylaşan aboneler de olsun
+        subs.append(Subscriber(f"abone{rng.randint(0, n // 2)}", str(i), filters))
+    return subs
+
+
+def _random_items(rng, n):
+    return [{"origin": rng.choice(CITIES), "destination": rng.choice(CITIES),
+             "price": rng.choice([0, 4999, 5000, 12000, 29999, 45000])} for _ in range(n)]
+
+
+def test_parity_with_per_subscriber_filters():
+    rng = random.Random(7)
+    subs = _random_subs(rng, 40)
+    index = FilterIndex(subs, normalize_tr)
+    order = list(dict.fromkeys(s.name for s in subs))
+    for item in _random_items(rng, 500):
+        expected = {s.name for s in subs if _matches(s.filters, item)}
+        assert index.match(item) == [n for n in order if n in expected]
+
+
+def test_parity_with_apply_filters():
+    scraper = pytest.importorskip("scraper")
+    rng = random.Random(11)
+    subs = _random_subs(rng, 20)
+    items = _random_items(rng, 300)
+    index = FilterIndex(subs, normalize_tr)
+    for sub in subs:
+        # Aynı adlı aboneler birleştiği için yalnızca tekil adlar karşılaştırılır
+        if sum(s.name == sub.name for s in subs) > 1:
+            continue
+        expected = [id(it) for it in scraper.apply_filters(items, {"filters": sub.filters})]
+        assert [id(it) for it in items if sub.name in index.match(it)] == expected
+
+
+def test_empty_filters_match_everything():
+    index = FilterIndex([Subscriber("hepsi", "1"), Subscriber("ucuz", "2", {"max_price": 100})], normalize_tr)
+    assert index.match({"origin": "", "destination": "", "price": 0}) == ["hepsi", "ucuz"]
+    assert index.match({"origin": "Roma", "destination": "Paris", "price": 101}) == ["hepsi"]
+
+
+def test_aho_corasick_overlapping_patterns():
+    ac = AhoCorasick()
+    for pattern, value in [("he", 1), ("she", 2), ("his", 3), ("hers", 4)]:
+        ac.add(pattern, value)
+    ac.build()
+    assert ac.find("ushers") == {1, 2, 4}
+    assert ac.find("xyz") == set()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+import json
+
+import state_store
+
+
+def _store(tmp_path, max_bytes=state_store.JOURNAL_MAX_BYTES):
+    return state_store.JournalStateStore(str(tmp_path / "state.json"), str(tmp_path / "seen.jsonl"),
+                                         max_bytes=max_bytes)
+
+
+def _entry(n):
+    return {"first_seen": "2026-01-01T00:00:00+00:00", "url": f"https://x/ilan/{n}", "price": n}
+
+
+def test_partial_last_line_is_skipped(tmp_path):
+    store = _store(tmp_path)
+    store.load()
+    store.mark_seen("1", _entry(1))
+    # Yazım sırasında çökme: son satır yarım kalmış
+    with open(tmp_path / "seen.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"id": "2", "entry": {"url": "https://x/il')
+
+    store = _store(tmp_path)
+    assert set(store.load()["seen_ids"]) == {"1"}
+    # Yarım satır kapatıldığı için yeni kayıt ona yapışmaz
+    store.mark_seen("3", _entry(3))
+    assert set(_store(tmp_path).load()["seen_ids"]) == {"1", "3"}
+
+
+def test_crash_between_snapshot_and_truncate(tmp_path):
+    store = _store(tmp_path)
+    store.load()
+    for n in range(5):
+        store.mark_seen(str(n), _entry(n))
+    # compact() anlık görüntüyü yazdı ama günlük boşaltılmadan süreç öldü
+    store.save()
+    assert (tmp_path / "seen.jsonl").stat().st_size > 0
+
+    seen = _store(tmp_path).load()["seen_ids"]
+    assert set(seen) == {str(n) for n in range(5)}
+    assert seen["4"]["price"] == 4
+
+
+def test_crash_before_snapshot_replace(tmp_path):
+    store = _store(tmp_path)
+    store.load()
+    store.mark_seen("1", _entry(1))
+    store.compact()
+    store.mark_seen("2", _entry(2))
+    # Yarım yazılmış geçici anlık görüntü os.replace'ten önce kalmış
+    (tmp_path / "state.json.tmp").write_text('{"seen_ids": {"x"', encoding="utf-8")
+
+    assert set(_store(tmp_path).load()["seen_ids"]) == {"1", "2"}
+
+
+def test_compacts_when_journal_grows(tmp_path):
+    store = _store(tmp_path, max_bytes=400)
+    store.load()
+    for n in range(20):
+        store.mark_seen(str(n), _entry(n))
+    assert (tmp_path / "seen.jsonl").stat().st_size <= 400
+    with open(tmp_path / "state.json", encoding="utf-8") as f:
+        snapshot = json.load(f)["seen_ids"]
+    assert len(snapshot) >= 15
+    assert set(_store(tmp_path).load()["seen_ids"]) == {str(n) for n in range(20)}
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+from notify_queue import NotificationQueue
+from outbox import Outbox
+
+
+class FakeSend:
+    """send(text, chat_id) taklidi; fail_on içindeki metinlerde hata döner."""
+
+    def __init__(self, fail_on=()):
+        self.fail_on = set(fail_on)
+        self.sent = []
+
+    def __call__(self, text, chat_id=None):
+        if text in self.fail_on:
+            return False, "HTTP 500"
+        self.sent.append((text, chat_id))
+        return True, None
+
+
+def test_ack_and_fail_callbacks(tmp_path):
+    send = FakeSend(fail_on=["kötü"])
+    box = Outbox(str(tmp_path / "outbox.json"))
+    acked, failed = [], []
+    with NotificationQueue(send, outbox=box) as q:
+        q.submit("iyi", on_ack=lambda: acked.append("iyi"), key="1", meta={"record": {}}, chat_id="c1")
+        q.submit("kötü", on_fail=failed.append, key="2", meta={"record": {}})
+    assert acked == ["iyi"] and failed == ["HTTP 500"]
+    assert send.sent == [("iyi", "c1")]
+    assert q.sent == 1 and q.failed == 1
+    # Başarılı mesaj outbox'ta kalmaz; başarısız olan yazılır
+    assert [k for k, _ in box.pending()] == ["2"]
+
+
+def test_failed_split_message_keeps_only_unsent_chunks(tmp_path):
+    send = FakeSend(fail_on=["parça 2"])
+    box = Outbox(str(tmp_path / "outbox.json"))
+    chunks = ["parça 1", "parça 2", "parça 3"]
+    with NotificationQueue(send, outbox=box) as q:
+        q.submit_batch(chunks, [("tam metin", None, None, "ilan", "1", {"item_id": "1"})])
+    assert send.sent == [("parça 1", None)]
+    (key, entry), = box.pending()
+    assert entry["text"] == "tam metin"
+    assert entry["meta"] == {"item_id": "1", "chunks": ["parça 2", "parça 3"]}
+
+    # Yeniden deneme (drain_outbox gibi): kalan parçalar gönderilir, ilk parça tekrarlanmaz
+    send.fail_on = {"parça 3"}
+    meta = entry["meta"]
+    with NotificationQueue(send, outbox=box) as q:
+        q.submit_batch(meta["chunks"], [(entry["text"], None, None, key, key, meta)])
+    assert [t for t, _ in send.sent] == ["parça 1", "parça 2"]
+    (_, entry), = box.pending()
+    assert entry["meta"]["chunks"] == ["parça 3"]
+    assert entry["attempts"] == 2
+
+    send.fail_on = set()
+    acked = []
+    meta = entry["meta"]
+    with NotificationQueue(send, outbox=box) as q:
+        q.submit_batch(meta["chunks"], [(entry["text"], lambda: acked.append(key), None, key, key, meta)])
+    assert [t for t, _ in send.sent] == chunks
+    assert acked == ["1"] and len(box) == 0
+
+
+def test_failed_batch_stores_each_listing(tmp_path):
+    send = FakeSend(fail_on=["a\n\nb"])
+    box = Outbox(str(tmp_path / "outbox.json"))
+    parts = [("a", None, None, "a", "1", {"r": 1}), ("b", None, None, "b", "2", {"r": 2})]
+    with NotificationQueue(send, outbox=box) as q:
+        q.submit_batch(["a\n\nb"], parts)
+    pending = dict(box.pending())
+    # Özet başarısızsa her ilan kendi metniyle ayrı saklanır; parça bilgisi eklenmez
+    assert {k: (e["text"], e["meta"]) for k, e in pending.items()} == {"1": ("a", {"r": 1}), "2": ("b", {"r": 2})}
+
+
+def test_send_exception_counts_as_failure():
+    def send(text, chat_id=None):
+        raise ConnectionError("bağlantı koptu")
+
+    errors = []
+    with NotificationQueue(send, workers=2) as q:
+        for i in range(4):
+            q.submit(str(i), on_fail=errors.append)
+    assert errors == ["bağlantı koptu"] * 4
+    assert q.failed == 4 and q.sent == 0
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+import outbox
+
+
+def _boxes(tmp_path):
+    return {
+        "json": lambda: outbox.Outbox(str(tmp_path / "outbox.json")),
+        "sqlite": lambda: outbox.SqliteOutbox(str(tmp_path / "outbox.db")),
+    }
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_add_persists_and_counts_attempts(tmp_path, backend):
+    make = _boxes(tmp_path)[backend]
+    box = make()
+    box.add("1", "mesaj", {"item_id": "1", "chunks": ["b"]}, "HTTP 500")
+    box.add("2", "ikinci", {"item_id": "2"})
+    # Aynı anahtar yeniden eklenince deneme sayısı artar; meta verilmezse eskisi kalır
+    box.add("1", "mesaj", None, "HTTP 429")
+    box.close()
+
+    box = make()
+    pending = dict(box.pending())
+    assert list(pending) == ["1", "2"]
+    assert pending["1"]["attempts"] == 2
+    assert pending["1"]["meta"] == {"item_id": "1", "chunks": ["b"]}
+    assert pending["1"]["last_error"] == "HTTP 429"
+    box.remove("1")
+    assert "1" not in box and len(box) == 1
+    box.close()
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_expire(tmp_path, backend):
+    box = _boxes(tmp_path)[backend]()
+    box.max_attempts = 3
+    box.max_age_hours = 24
+    for _ in range(3):
+        box.add("cok_denendi", "a")
+    box.add("taze", "b")
+    later = datetime.now(timezone.utc) + timedelta(hours=1)
+    assert box.expire(later) == ["cok_denendi"]
+    assert box.expire(later + timedelta(days=2)) == ["taze"]
+    assert len(box) == 0
+    box.close()
+
+
+def test_drain_outbox_resumes_remaining_chunks(tmp_path):
+    scraper = pytest.importorskip("scraper")
+
+    class Notifier:
+        def __init__(self):
+            self.batches = []
+
+        def submit_batch(self, texts, parts, label="", chat_id=None):
+            self.batches.append((texts, parts, chat_id))
+
+    class Fanout:
+        def __init__(self, box):
+            self.outbox = box
+            self.notifier = Notifier()
+
+    box = outbox.Outbox(str(tmp_path / "outbox.json"))
+    long_text = "\n".join(f"satır {i} " + "x" * 90 for i in range(100))
+    box.add("ali|1", long_text, {"item_id": "1", "chat_id": "c1", "record": {"url": "u"},
+                                 "chunks": ["kalan parça"]})
+    box.add("2", "kısa", {"url": "u2"})   # abonelik öncesi biçim: meta doğrudan kayıt
+    fanout = Fanout(box)
+
+    assert scraper.drain_outbox(fanout, store=None) == {"1", "2"}
+    (texts1, _, chat1), (texts2, parts2, chat2) = fanout.notifier.batches
+    assert texts1 == ["kalan parça"] and chat1 == "c1"
+    assert texts2 == ["kısa"] and chat2 is None
+    assert parts2[0][5]["record"] == {"url": "u2"}
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timezone, timedelta
+
+import state_store
+
+NOW = datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+
+def _ago(days):
+    return (NOW - timedelta(days=days)).isoformat()
+
+
+def test_age_uses_last_seen():
+    seen = {
+        "eski_ama_yayinda": {"first_seen": _ago(90), "last_seen": _ago(1)},
+        "kaybolmus": {"first_seen": _ago(90), "last_seen": _ago(40)},
+        "eski_kayit": {"first_seen": _ago(40)},   # last_seen yok: first_seen kullanılır
+        "yeni": {"first_seen": _ago(2)},
+    }
+    evict = state_store.RetentionPolicy(max_age_days=30).select_evictions(seen, NOW)
+    assert evict == {"kaybolmus": "age", "eski_kayit": "age"}
+
+
+def test_lru_evicts_least_recently_seen():
+    seen = {str(n): {"first_seen": _ago(100), "last_seen": _ago(n)} for n in range(10)}
+    evict = state_store.RetentionPolicy(max_entries=7).select_evictions(seen, NOW)
+    assert evict == {"9": "lru", "8": "lru", "7": "lru"}
+
+
+def test_age_then_lru():
+    seen = {str(n): {"last_seen": _ago(n * 10)} for n in range(6)}
+    evict = state_store.RetentionPolicy(max_age_days=35, max_entries=2).select_evictions(seen, NOW)
+    assert evict == {"4": "age", "5": "age", "3": "lru", "2": "lru"}
+
+
+def test_disabled_policy():
+    assert state_store.RetentionPolicy.from_config({}) is None
+    assert state_store.RetentionPolicy.from_config({"retention": {"max_age_days": 0}}) is None
+
+
+def test_store_applies_retention_and_touch_keeps_entry(tmp_path):
+    store = state_store.SqliteStateStore(str(tmp_path / "state.db"), str(tmp_path / "state.json"))
+    store.load()
+    store.mark_seen("yayinda", {"first_seen": _ago(60), "url": "u1", "price": 1})
+    store.mark_seen("kalkti", {"first_seen": _ago(60), "url": "u2", "price": 1})
+    # Ana sayfada hâlâ görünen ilan tazelenir
+    assert store.touch(["yayinda", "yok"], now=NOW) == ["yayinda"]
+    store.retention = state_store.RetentionPolicy(max_age_days=30)
+    assert store.apply_retention(NOW) == {"kalkti": "age"}
+    store.close()
+
+    reopened = state_store.SqliteStateStore(str(tmp_path / "state.db"), str(tmp_path / "state.json"))
+    assert set(reopened.load()["seen_ids"]) == {"yayinda"}
+    reopened.close()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+import state_store
+
+ENTRY = {"first_seen": "2026-01-01T00:00:00+00:00", "url": "https://x/ilan/1", "price": 10000,
+         "notified_price": 12000, "date_keys": ["ab12cd34"]}
+
+
+def _backends(tmp_path):
+    return {
+        "json": lambda: state_store.JsonStateStore(str(tmp_path / "state.json")),
+        "sqlite": lambda: state_store.SqliteStateStore(str(tmp_path / "state.db"),
+                                                       str(tmp_path / "state.json")),
+        "journal": lambda: state_store.JournalStateStore(str(tmp_path / "state.json"),
+                                                         str(tmp_path / "seen.jsonl")),
+    }
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite", "journal"])
+def test_round_trip(tmp_path, backend):
+    make = _backends(tmp_path)[backend]
+    store = make()
+    store.load()
+    store.mark_seen("1", dict(ENTRY))
+    store.mark_seen("2", dict(ENTRY, url="https://x/ilan/2", price=5000))
+    store.close()
+
+    reopened = make()
+    seen = reopened.load()["seen_ids"]
+    reopened.close()
+    assert set(seen) == {"1", "2"}
+    # Ek alanlar (notified_price, date_keys) ve mark_seen'in eklediği last_seen korunur
+    assert seen["1"] == dict(ENTRY, last_seen=ENTRY["first_seen"])
+    assert seen["2"]["price"] == 5000
+
+
+def test_sqlite_migrates_json_once(tmp_path):
+    json_path = tmp_path / "state.json"
+    json_path.write_text(json.dumps({"seen_ids": {"1": ENTRY, "2": {"url": "u2", "price": 7}}}),
+                         encoding="utf-8")
+    store = state_store.SqliteStateStore(str(tmp_path / "state.db"), str(json_path))
+    seen = store.load()["seen_ids"]
+    assert seen["1"] == ENTRY
+    assert seen["2"]["price"] == 7
+    # İkinci açılışta tekrar taşınmaz (tablodan silinen kayıt geri gelmez)
+    assert store.migrate_from_json() == 0
+    store.close()
+
+
+def test_sqlite_refuses_corrupt_json(tmp_path):
+    json_path = tmp_path / "state.json"
+    json_path.write_text("{bozuk", encoding="utf-8")
+    store = state_store.SqliteStateStore(str(tmp_path / "state.db"), str(json_path))
+    with pytest.raises(RuntimeError):
+        store.load()
+    store.close()
+
+
+def test_json_refuses_corrupt_file(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text("{bozuk", encoding="utf-8")
+    with pytest.raises(RuntimeError):
+        state_store.JsonStateStore(str(path)).load()
+    # Dosyanın üzerine yazılmaz
+    assert path.read_text(encoding="utf-8") == "{bozuk"
+
+
+def test_open_store_backend(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert isinstance(state_store.open_store({"state_backend": "journal"}), state_store.JournalStateStore)
+    store = state_store.open_store({"state_backend": "sqlite", "retention": {"max_entries": 5}})
+    assert isinstance(store, state_store.SqliteStateStore)
+    assert store.retention.max_entries == 5
+    store.close()
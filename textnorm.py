@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Türkçe metin normalizasyonu (şehir adları, ay adları karşılaştırması için)
+- 'İstanbul', 'ISTANBUL', 'ıstanbul' -> 'istanbul'; 'Şubat' -> 'subat'
+- Hızlı yol: Türkçe harfleri tek str.translate ile ASCII'ye indirir; sonuç ASCII ise
+  NFKD + combining filtresi atlanır
+- Diğer girdiler (başka aksanlar, \\xa0 vb.) eski NFKD yolundan geçer
+- Aynı birkaç şehir/ay adı sürekli tekrarlandığı için sonuçlar sınırlı LRU önbellekte tutulur
+
+Mikro kıyaslama: python textnorm.py
+"""
+
+import unicodedata
+from functools import lru_cache
+
+CACHE_SIZE = 4096
+
+# NFKD + combining filtresi + lower ile aynı sonucu veren doğrudan eşlemeler
+_TR_TABLE = str.maketrans({
+    "İ": "i", "I": "i", "ı": "i", "Î": "i", "î": "i",
+    "Ç": "c", "ç": "c", "Ğ": "g", "ğ": "g", "Ö": "o", "ö": "o",
+    "Ş": "s", "ş": "s", "Ü": "u", "ü": "u", "Â": "a", "â": "a", "Û": "u", "û": "u",
+})
+
+
+def _normalize_slow(s: str) -> str:
+    s = s.replace("İ", "i").replace("I", "i").replace("ı", "i")
+    s = unicodedata.normalize("NFKD", s)
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return s.lower().strip()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_tr(s: str) -> str:
+    """
+    Türkçe karakter ve i/ı/İ normalizasyonu + aksan kaldırma + lower.
+    'İstanbul', 'ISTANBUL', 'ıstanbul' -> 'istanbul'
+    """
+    if not s:
+        return ""
+    t = s.translate(_TR_TABLE)
+    if t.isascii():
+        return t.lower().strip()
+    return _normalize_slow(s)
+
+
+if __name__ == "__main__":
+    import timeit
+
+    words = ["İstanbul", "ISTANBUL", "Sabiha Gökçen", "Ankara", "İzmir", "Muğla", "Kasım",
+             "Aralık", "Şubat", "Ağustos", "Eylül", "Paris", "Düsseldorf", "Zürich", " Bakü "]
+    for w in words:
+        assert normalize_tr(w) == _normalize_slow(w), w
+    n = 20_000
+
+    def run(fn):
+        for w in words:
+            fn(w)
+
+    slow = timeit.timeit(lambda: run(_normalize_slow), number=n)
+    normalize_tr.cache_clear()
+    fast_nocache = timeit.timeit(lambda: run(normalize_tr.__wrapped__), number=n)
+    cached = timeit.timeit(lambda: run(normalize_tr), number=n)
+    calls = n * len(words)
+    print(f"{calls} çağrı")
+    print(f"eski (NFKD)        : {slow:.3f}s  ({slow / calls * 1e6:.2f} µs/çağrı)")
+    print(f"translate hızlı yol: {fast_nocache:.3f}s  (x{slow / fast_nocache:.1f})")
+    print(f"LRU önbellekli     : {cached:.3f}s  (x{slow / cached:.1f})  {normalize_tr.cache_info()}")
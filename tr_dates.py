@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Türkçe tarih ayrıştırma & biçimleme
+- Desenler modül yüklenirken bir kez derlenir; ay/gün adları sabit tablolardan okunur
+- Desteklenen satır biçimleri:
+    * 24 Kasım – 01 Aralık / 24 Kasım 2025 - 01 Aralık 2025
+    * 24-30 Kasım / 24 – 30 Kasım 2025
+    * 24.11.2025 - 01.12.2025 (/ ile de olur)
+    * tek tarih: satırın tamamı "24 Kasım 2025", "24 Kasım Pazartesi" ya da "24.11.2025" ise
+- Ay adı çözülemeyen satırlar (ör. "2 yetişkin - 1 çocuk") hata değil None döner
+
+Kıyaslama: python tr_dates.py [satirlar.txt]
+"""
+
+import re
+from datetime import datetime
+
+from textnorm import normalize_tr
+
+MONTH_NAMES = ["", "Ocak", "Şubat", "Mart", "Nisan", "Mayıs", "Haziran",
+               "Temmuz", "Ağustos", "Eylül", "Ekim", "Kasım", "Aralık"]
+DAY_NAMES = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
+
+# normalize_tr(ay adı) -> ay numarası; tam adlar + üç harfli kısaltmalar (Kas., Ara.)
+MONTHS = {}
+for _i, _name in enumerate(MONTH_NAMES[1:], start=1):
+    MONTHS[normalize_tr(_name)] = _i
+    MONTHS[normalize_tr(_name)[:3]] = _i
+
+_WORD = r"[A-Za-zÇĞİÖŞÜçğıöşüÂâÎîÛû]+"
+_DASH = r"\s*[–—\-]\s*"
+_DM = r"(?<!\d)(\d{1,2})\s+(" + _WORD + r")\.?"
+_NUM = r"(?<!\d)(\d{1,2})[./](\d{1,2})[./](\d{4}|\d{2})(?!\d)"
+
+# 24 Kasım 2025 – 01 Aralık 2025 (ilk tarihin ardında gün adı olabilir: "13 Mart Cuma – 20 Mart Cuma")
+RANGE_RE = re.compile(
+    _DM + r"\s*(\d{4})?(?:\s*,?\s*" + _WORD + r")?" + _DASH + _DM + r"\s*(\d{4})?", re.IGNORECASE
+)
+# 24-30 Kasım 2025
+SHORT_RANGE_RE = re.compile(r"(?<!\d)(\d{1,2})" + _DASH + _DM + r"\s*(\d{4})?", re.IGNORECASE)
+# 24.11.2025 - 01.12.2025
+NUMERIC_RANGE_RE = re.compile(_NUM + _DASH + _NUM)
+# Satırın tamamı tek bir tarih (arkasında gün adı olabilir)
+SINGLE_RE = re.compile(_DM + r"(?:\s*(\d{4}))?(?:\s*,?\s*" + _WORD + r")?", re.IGNORECASE)
+SINGLE_NUMERIC_RE = re.compile(_NUM)
+# Rakam içermeyen satırlar (açıklamalar, başlıklar) desenlere hiç sokulmaz
+_HAS_DIGIT = re.compile(r"\d").search
+
+
+def month_to_num(name: str) -> int:
+    return MONTHS.get(normalize_tr(name), 0)
+
+
+def tr_format_date(dt: datetime) -> str:
+    """'24 Kasım Pazartesi' biçimi."""
+    return f"{dt.day:02d} {MONTH_NAMES[dt.month]} {DAY_NAMES[dt.weekday()]}"
+
+
+def _year(year_s) -> int:
+    if not year_s:
+        return 0
+    y = int(year_s)
+    return y + 2000 if y < 100 else y
+
+
+def parse_tr_date(day_s, month_s, year_s="") -> datetime:
+    """Gün + ay (ad ya da sayı) + isteğe bağlı yıl; çözülemezse None. Yıl yoksa bu yıl."""
+    m = int(month_s) if str(month_s).isdigit() else month_to_num(month_s)
+    if not 1 <= m <= 12:
+        return None
+    try:
+        return datetime(_year(year_s) or datetime.now().year, m, int(day_s))
+    except ValueError:
+        return None
+
+
+def _range(d1, mon1, y1, d2, mon2, y2):
+    # Yalnızca bitişte yıl varsa başlangıç da o yıla aittir
+    start = parse_tr_date(d1, mon1, y1 or y2)
+    end = parse_tr_date(d2, mon2, y2 or y1)
+    if not start or not end:
+        return None
+    # yıl taşması: bitiş başlangıçtan önceyse (24 Aralık – 05 Ocak) yılı düzelt
+    if end < start:
+        try:
+            if y2 and not y1:
+                start = start.replace(year=start.year - 1)
+            else:
+                end = end.replace(year=end.year + 1)
+        except ValueError:
+            return None
+    return start, end
+
+
+def parse_date_range_line(text: str):
+    """
+    '24 Kasım – 01 Aralık', '24-30 Kasım', '24.11.2025 - 01.12.2025' gibi satırları yakalar.
+    Dönüş: (start_dt, end_dt) veya None
+    """
+    t = text.strip()
+    if not _HAS_DIGIT(t):
+        return None
+    m = RANGE_RE.search(t)
+    if m:
+        pr = _range(*m.groups())
+        if pr:
+            return pr
+    m = SHORT_RANGE_RE.search(t)
+    if m:
+        d1, d2, mon, y = m.groups()
+        pr = _range(d1, mon, y, d2, mon, y)
+        if pr:
+            return pr
+    m = NUMERIC_RANGE_RE.search(t)
+    if m:
+        d1, m1, y1, d2, m2, y2 = m.groups()
+        return _range(d1, m1, y1, d2, m2, y2)
+    return None
+
+
+def parse_single_date(text: str):
+    """Satırın tamamı tek bir tarihse datetime, değilse None."""
+    t = text.strip()
+    if not _HAS_DIGIT(t):
+        return None
+    m = SINGLE_RE.fullmatch(t)
+    if m:
+        return parse_tr_date(*m.groups())
+    m = SINGLE_NUMERIC_RE.fullmatch(t)
+    if m:
+        return parse_tr_date(*m.groups())
+    return None
+
+
+def parse_date_line(text: str):
+    """Aralık satırı → (start, end); tek tarih satırı → (tarih, None); diğerleri → None."""
+    pr = parse_date_range_line(text)
+    if pr:
+        return pr
+    d = parse_single_date(text)
+    return (d, None) if d else None
+
+
+if __name__ == "__main__":
+    import sys
+    import timeit
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding="utf-8") as f:
+            corpus = [line.strip() for line in f if line.strip()]
+    else:
+        corpus = [
+            "24 Kasım – 01 Aralık", "24 Kasım 2025 - 01 Aralık 2025", "28 Aralık – 04 Ocak",
+            "05 Şubat – 12 Şubat (7 Gün)", "13 Mart Cuma – 20 Mart Cuma", "24-30 Kasım",
+            "3 – 10 Ağustos 2026", "24.11.2025 - 01.12.2025", "01/02/26 – 09/02/26",
+            "24 Kasım 2025", "07 Eylül Pazar", "15.10.2025", "2 yetişkin - 1 çocuk",
+            "Fiyatlara vergiler dahildir", "Gidiş-dönüş, aktarmalı", "Kas. 24 - Ara. 1",
+        ]
+
+    # Önceki scraper.py uygulaması (norm + her çağrıda derlenen desen + tablo yeniden kurma)
+    from textnorm import _normalize_slow as norm
+    OLD_MAP = {
+        "ocak": 1, "şubat": 2, "subat": 2, "mart": 3, "nisan": 4, "mayıs": 5, "mayis": 5,
+        "haziran": 6, "temmuz": 7, "ağustos": 8, "agustos": 8, "eylül": 9, "eylul": 9,
+        "ekim": 10, "kasım": 11, "kasim": 11, "aralık": 12, "aralik": 12
+    }
+
+    def old_format(dt):
+        ay = list(OLD_MAP.keys())[list(OLD_MAP.values()).index(dt.month)]
+        pretty = {
+            "ocak": "Ocak", "subat": "Şubat", "şubat": "Şubat", "mart": "Mart", "nisan": "Nisan",
+            "mayis": "Mayıs", "mayıs": "Mayıs", "haziran": "Haziran", "temmuz": "Temmuz",
+            "agustos": "Ağustos", "ağustos": "Ağustos", "eylul": "Eylül", "eylül": "Eylül",
+            "ekim": "Ekim", "kasim": "Kasım", "kasım": "Kasım", "aralik": "Aralık", "aralık": "Aralık"
+        }.get(norm(ay), ay.capitalize())
+        return f"{dt.day:02d} {pretty} {DAY_NAMES[dt.weekday()]}"
+
+    def legacy(line):
+        import re as _re
+        pat = _re.compile(
+            r"(\d{1,2})\s+([A-Za-zÇĞİÖŞÜçğıöşü]+)\s*(\d{4})?\s*[–—\-]\s*(\d{1,2})\s+([A-Za-zÇĞİÖŞÜçğıöşü]+)\s*(\d{4})?",
+            _re.IGNORECASE
+        )
+        m = pat.search(line.strip())
+        if not m:
+            return None
+        out = []
+        for d, mon, y in ((m.group(1), m.group(2), m.group(3)), (m.group(4), m.group(5), m.group(6))):
+            num = OLD_MAP.get(norm(mon), 0)
+            if not num:
+                return None
+            out.append(old_format(datetime(int(y) if y else datetime.utcnow().year, num, int(d))))
+        return out
+
+    def current(line):
+        pr = parse_date_line(line)
+        if pr:
+            return [tr_format_date(d) for d in pr if d]
+        return None
+
+    for line in corpus:
+        print(f"{line!r:40} -> {current(line)}")
+
+    def bench(title, lines, n=2000):
+        if not lines:
+            return
+        old = timeit.timeit(lambda: [legacy(x) for x in lines], number=n)
+        new = timeit.timeit(lambda: [current(x) for x in lines], number=n)
+        total = n * len(lines)
+        print(f"\n{title}: {total} satır")
+        print(f"  eski : {old / total * 1e6:.2f} µs/satır")
+        print(f"  yeni : {new / total * 1e6:.2f} µs/satır  x{old / new:.1f}")
+
+    bench("tüm derlem", corpus)
+    bench("eski desenin de çözdüğü satırlar", [x for x in corpus if legacy(x)])
+    bench("tarih olmayan satırlar", [x for x in corpus if not current(x)])